@@ -1,30 +1,24 @@
-from groq import Groq
 import os
 from dotenv import load_dotenv
 from datetime import datetime
 import json
 
-load_dotenv()
-
-# Lazy initialization - avoids crash if GROQ_API_KEY not set at import time
-_client = None
+from cv_profile import get_profile
+from job_text import prompt_description
+import llm_gateway
 
+load_dotenv()
 
-def _get_client():
-    global _client
-    if _client is None:
-        _client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    return _client
+# Token budget for the compact CV rendering sent with cover letter prompts
+COVER_LETTER_CV_TOKENS = int(os.getenv("COVER_LETTER_CV_TOKENS", "1200"))
 
 
 def load_cv():
-    """Load CV content from env var (production) or file (local)"""
-    cv_content = os.getenv("CV_CONTENT")
-    if cv_content:
-        return cv_content
-    cv_path = os.path.join(os.path.dirname(__file__), "my_cv.txt")
-    with open(cv_path, "r") as f:
-        return f.read()
+    """Compact CV text from env var (production) or file (local), parsed once"""
+    profile = get_profile()
+    if profile is None:
+        raise FileNotFoundError("CV not configured: set CV_CONTENT or create my_cv.txt")
+    return profile.render(COVER_LETTER_CV_TOKENS)
 
 
 def detect_language(text):
@@ -39,21 +33,14 @@ def detect_language(text):
     return "fr" if french_count > english_count else "en"
 
 
-def generate_cover_letter(job_data, cv_content=None, language="fr"):
-    """
-    Generate tailored cover letter for a specific job.
-
-    Args:
-        job_data: dict with job_title, company, job_description, matching_skills, missing_skills
-        cv_content: optional CV text (loads from file if not provided)
-        language: 'fr' for French or 'en' for English (default: 'fr')
-
-    Returns:
-        dict with cover_letter text and metadata
-    """
+def build_cover_letter_prompt(job_data, cv_content=None, language="fr"):
+    """Cover letter prompt for a job, in the requested language"""
     if cv_content is None:
         cv_content = load_cv()
 
+    # Cleaned, boilerplate-free and token-budgeted description
+    description = prompt_description(job_data.get("job_description", ""))
+
     # Debug: Print what language was received
     print(f"\n{'='*60}")
     print(f"🔍 Language parameter received: '{language}' (type: {type(language)})")
@@ -68,7 +55,7 @@ def generate_cover_letter(job_data, cv_content=None, language="fr"):
     JOB POSTING:
     Position: {job_data['job_title']}
     Company: {job_data['company']}
-    Description: {job_data.get('job_description', 'Not provided')}
+    Description: {description or 'Not provided'}
 
     ANALYSIS:
     Matching Skills: {', '.join(job_data.get('matching_skills', []))}
@@ -100,7 +87,7 @@ def generate_cover_letter(job_data, cv_content=None, language="fr"):
     OFFRE D'EMPLOI:
     Poste: {job_data['job_title']}
     Entreprise: {job_data['company']}
-    Description: {job_data.get('job_description', 'Non fournie')}
+    Description: {description or 'Non fournie'}
 
     ANALYSE:
     Compétences correspondantes: {', '.join(job_data.get('matching_skills', []))}
@@ -132,39 +119,54 @@ def generate_cover_letter(job_data, cv_content=None, language="fr"):
         prompt = prompt_fr
         print("✅ Selected FRENCH prompt")
 
-    try:
-        response = _get_client().chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=1000,
-        )
+    return prompt
 
-        cover_letter_text = response.choices[0].message.content.strip()
 
-        # Detect actual language of generated text
-        first_words = cover_letter_text[:100].lower()
-        is_french = any(
-            word in first_words
-            for word in ["madame", "monsieur", "votre", "entreprise"]
-        )
-        is_english = any(
-            word in first_words for word in ["dear", "hiring", "manager", "position"]
-        )
+def _cover_letter_result(cover_letter_text, job_data, language):
+    # Detect actual language of generated text
+    first_words = cover_letter_text[:100].lower()
+    is_french = any(
+        word in first_words
+        for word in ["madame", "monsieur", "votre", "entreprise"]
+    )
+    is_english = any(
+        word in first_words for word in ["dear", "hiring", "manager", "position"]
+    )
+
+    actual_language = "fr" if is_french else ("en" if is_english else language)
+
+    print(f"📝 Generated {len(cover_letter_text)} characters")
+    print(f"🌍 Requested: {language}, Detected in output: {actual_language}")
 
-        actual_language = "fr" if is_french else ("en" if is_english else language)
+    return {
+        "cover_letter": cover_letter_text,
+        "generated_at": datetime.now().isoformat(),
+        "job_title": job_data["job_title"],
+        "company": job_data["company"],
+        "word_count": len(cover_letter_text.split()),
+        "language": actual_language,
+    }
+
+
+def generate_cover_letter(job_data, cv_content=None, language="fr"):
+    """
+    Generate tailored cover letter for a specific job.
+
+    Args:
+        job_data: dict with job_title, company, job_description, matching_skills, missing_skills
+        cv_content: optional CV text (loads from file if not provided)
+        language: 'fr' for French or 'en' for English (default: 'fr')
 
-        print(f"📝 Generated {len(cover_letter_text)} characters")
-        print(f"🌍 Requested: {language}, Detected in output: {actual_language}")
+    Returns:
+        dict with cover_letter text and metadata
+    """
+    prompt = build_cover_letter_prompt(job_data, cv_content, language)
 
-        return {
-            "cover_letter": cover_letter_text,
-            "generated_at": datetime.now().isoformat(),
-            "job_title": job_data["job_title"],
-            "company": job_data["company"],
-            "word_count": len(cover_letter_text.split()),
-            "language": actual_language,
-        }
+    try:
+        response = llm_gateway.complete(
+            prompt, task="cover_letter", temperature=0.7, max_tokens=1000
+        )
+        return _cover_letter_result(response.text.strip(), job_data, language)
 
     except Exception as e:
         print(f"Error generating cover letter: {e}")
@@ -173,6 +175,23 @@ def generate_cover_letter(job_data, cv_content=None, language="fr"):
         raise
 
 
+def stream_cover_letter(job_data, cv_content=None, language="fr"):
+    """
+    Generate a cover letter, yielding it while it is written.
+
+    Yields:
+        ("token", text chunk) pairs, then one ("result", dict) pair with the
+        same metadata generate_cover_letter returns
+    """
+    prompt = build_cover_letter_prompt(job_data, cv_content, language)
+
+    chunks = []
+    for chunk in llm_gateway.stream(prompt, task="cover_letter", temperature=0.7, max_tokens=1000):
+        chunks.append(chunk)
+        yield "token", chunk
+    yield "result", _cover_letter_result("".join(chunks).strip(), job_data, language)
+
+
 def save_cover_letter(cover_letter_data, filename=None):
     """Save cover letter to file"""
     if filename is None:
@@ -0,0 +1,226 @@
+"""
+CV Profile - Parse the CV once and render compact, token-budgeted versions
+
+The CV comes from the CV_CONTENT env var (production) or my_cv.txt (local).
+It is parsed into sections (summary, skills, experience, education, ...)
+the first time it is needed and only re-parsed when the env var or the
+file's mtime changes, so prompts don't pay for file I/O on every request.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+
+CV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "my_cv.txt")
+
+# How often (seconds) to stat my_cv.txt for changes
+RELOAD_CHECK_INTERVAL = float(os.getenv("CV_RELOAD_CHECK_SECONDS", "2"))
+
+# Sections in the order they are kept when a rendering has to be truncated
+SECTION_PRIORITY = [
+    "header",
+    "summary",
+    "skills",
+    "experience",
+    "projects",
+    "education",
+    "certifications",
+    "languages",
+    "interests",
+]
+
+SECTION_KEYWORDS = [
+    ("skill", "skills"),
+    ("experience", "experience"),
+    ("project", "projects"),
+    ("education", "education"),
+    ("summary", "summary"),
+    ("profile", "summary"),
+    ("certif", "certifications"),
+    ("language", "languages"),
+    ("interest", "interests"),
+]
+
+# Contact details don't help the LLM judge fit and cost tokens
+CONTACT_FIELDS = ("EMAIL:", "PHONE:", "LINKEDIN:")
+
+# Bullets up to this length are folded into their "Label:" line
+SHORT_BULLET_CHARS = 60
+
+_SEPARATOR = re.compile(r"^\s*[=\-_*#]{5,}\s*$")
+_HEADING = re.compile(r"^[A-Z][A-Z0-9 &/,'()\-]{2,}:?$")
+_PLACEHOLDER = re.compile(r"^\[Optional:.*\]$")
+
+
+def estimate_tokens(text):
+    # Rough rule of thumb (~4 characters per token), good enough for budgeting
+    return len(text) // 4 + 1
+
+
+def _section_key(heading):
+    lowered = heading.lower()
+    for keyword, key in SECTION_KEYWORDS:
+        if keyword in lowered:
+            return key
+    return re.sub(r"[^a-z0-9]+", "_", lowered).strip("_")
+
+
+def _clean_line(line):
+    line = line.rstrip()
+    # Template placeholders like "[PhD] in [Computer Science]"
+    line = re.sub(r"\[([^\]]*)\]", r"\1", line)
+    return re.sub(r"[ \t]+", " ", line)
+
+
+class CVProfile:
+    """A parsed CV: ordered sections, a content hash and compact renderings"""
+
+    def __init__(self, text):
+        self.text = text
+        self.hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self.sections = self._parse(text)
+        self._renderings = {}
+
+    @staticmethod
+    def _parse(text):
+        sections = {"header": []}
+        current = "header"
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if _SEPARATOR.match(line):
+                continue
+            if _HEADING.match(line) and not line.startswith(CONTACT_FIELDS):
+                current = _section_key(line.rstrip(":"))
+                sections.setdefault(current, [])
+                continue
+            sections.setdefault(current, []).append(raw_line)
+        return {key: "\n".join(lines).strip() for key, lines in sections.items()}
+
+    def section(self, name):
+        return self.sections.get(name, "")
+
+    def _compact_section(self, name):
+        lines = []
+        folding = False
+        for raw_line in self.sections.get(name, "").splitlines():
+            if name == "header" and raw_line.strip().startswith(CONTACT_FIELDS):
+                continue
+            if _PLACEHOLDER.match(raw_line.strip()):
+                continue
+            line = _clean_line(raw_line)
+            stripped = line.strip()
+
+            # "Label:" followed by short bullets becomes "Label: a, b, c"
+            short_bullet = stripped.startswith("- ") and len(stripped) <= SHORT_BULLET_CHARS
+            if short_bullet and lines and (folding or lines[-1].endswith(":")):
+                separator = ", " if folding else " "
+                lines[-1] = f"{lines[-1]}{separator}{stripped[2:]}"
+                folding = True
+                continue
+            folding = False
+
+            if stripped or (lines and lines[-1].strip()):
+                lines.append(line)
+        return "\n".join(lines).strip()
+
+    def render(self, max_tokens=None):
+        """
+        Compact text version of the CV for prompts
+
+        Separator lines, contact details, template brackets and extra blank
+        lines are dropped. With max_tokens, sections are added in
+        SECTION_PRIORITY order until the budget is used up (the last one
+        is cut line by line).
+        """
+
+        if max_tokens in self._renderings:
+            return self._renderings[max_tokens]
+
+        ordered = SECTION_PRIORITY + [s for s in self.sections if s not in SECTION_PRIORITY]
+        parts = []
+        used = 0
+        for name in ordered:
+            body = self._compact_section(name)
+            if not body:
+                continue
+            title = "" if name == "header" else name.replace("_", " ").upper() + ":\n"
+            block = title + body
+            if max_tokens is not None and used + estimate_tokens(block) > max_tokens:
+                kept = []
+                for line in block.splitlines():
+                    if used + estimate_tokens("\n".join(kept + [line])) > max_tokens:
+                        break
+                    kept.append(line)
+                if len(kept) > 1 or (kept and not title):
+                    parts.append("\n".join(kept))
+                break
+            parts.append(block)
+            used += estimate_tokens(block)
+
+        rendering = "\n\n".join(parts)
+        self._renderings[max_tokens] = rendering
+        return rendering
+
+
+_lock = threading.Lock()
+_profile = None
+_source = None
+_last_check = 0.0
+
+
+def _current_source():
+    """Identify where the CV currently comes from and which version it is"""
+    cv_content = os.getenv("CV_CONTENT")
+    if cv_content:
+        return ("env", hashlib.sha256(cv_content.encode("utf-8")).hexdigest())
+    try:
+        stat = os.stat(CV_PATH)
+    except OSError:
+        return None
+    return ("file", stat.st_mtime_ns, stat.st_size)
+
+
+def get_profile():
+    """
+    Return the current CVProfile, re-parsing only when the CV changed
+
+    Returns:
+        CVProfile, or None if neither CV_CONTENT nor my_cv.txt is available
+    """
+
+    global _profile, _source, _last_check
+
+    now = time.monotonic()
+    env_set = bool(os.getenv("CV_CONTENT"))
+    # The file is only re-stat'ed every RELOAD_CHECK_INTERVAL seconds
+    if (
+        _profile is not None
+        and not env_set
+        and _source
+        and _source[0] == "file"
+        and now - _last_check < RELOAD_CHECK_INTERVAL
+    ):
+        return _profile
+
+    source = _current_source()
+    with _lock:
+        _last_check = now
+        if source == _source and (_profile is not None or source is None):
+            return _profile
+
+        if source is None:
+            text = None
+        elif source[0] == "env":
+            text = os.getenv("CV_CONTENT")
+        else:
+            with open(CV_PATH, "r", encoding="utf-8") as f:
+                text = f.read()
+
+        _profile = CVProfile(text) if text else None
+        _source = source
+        if _profile is not None:
+            print(f"CV profile loaded from {source[0]}: {len(_profile.sections)} sections, "
+                  f"~{estimate_tokens(_profile.render())} tokens compact")
+        return _profile
@@ -0,0 +1,189 @@
+"""
+Disk Cache - Small SQLite-backed key/value cache with TTL and LRU eviction
+
+Values are stored as JSON. The database runs in WAL mode so several
+processes (e.g. gunicorn workers) and threads can share one cache file;
+hit/miss totals are kept in the file too so they cover every process.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def make_key(*parts):
+    """Build a stable cache key from any JSON-serializable parts"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Persistent TTL + LRU cache stored in a single SQLite file"""
+
+    def __init__(self, path, ttl=3600, max_entries=1000):
+        """
+        Args:
+            path: SQLite file to use (parent directories are created)
+            ttl: Default time-to-live in seconds for new entries
+            max_entries: Entries kept before least-recently-used ones are evicted
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        conn.commit()
+
+    def _connect(self):
+        """Return this thread's connection (sqlite3 connections are per-thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, count=True):
+        """
+        Look up a key
+
+        Args:
+            key: Cache key
+            count: Whether the lookup counts towards hit/miss stats (False
+                for re-checks of a lookup that was already counted)
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or row[1] < now:
+            if row is not None:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            if count:
+                self._bump(conn, "misses")
+            conn.commit()
+            if count:
+                self._count_miss()
+            return None
+
+        conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+        if count:
+            self._bump(conn, "hits")
+        conn.commit()
+        if count:
+            self._count_hit()
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """Store a value, evicting least-recently-used entries if over capacity"""
+
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, created_at, expires_at, last_access)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now, now + ttl, now),
+        )
+        self._evict(conn, now)
+        conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        size = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        overflow = size - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN"
+                " (SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            with self._lock:
+                self.evictions += overflow
+            self._bump(conn, "evictions", overflow)
+
+    @staticmethod
+    def _bump(conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO cache_counters (name, value) VALUES (?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache")
+        conn.commit()
+
+    def _count_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stats(self):
+        """
+        Cache statistics
+
+        Returns:
+            dict with hit/miss counters for this process, the totals shared by
+            every process using the file, and the current entry count
+        """
+
+        conn = self._connect()
+        size = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        totals = dict(conn.execute("SELECT name, value FROM cache_counters").fetchall())
+        total_hits = totals.get("hits", 0)
+        total_lookups = total_hits + totals.get("misses", 0)
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "evictions": self.evictions,
+                "total_hits": total_hits,
+                "total_misses": totals.get("misses", 0),
+                "total_hit_rate": round(total_hits / total_lookups, 3) if total_lookups else 0,
+                "total_evictions": totals.get("evictions", 0),
+                "size": size,
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration for main:app (used by the Procfile)
+
+LLM-bound endpoints spend seconds waiting on Groq. With the default sync
+worker each of those requests blocks a whole worker, so a few concurrent
+analyses starve /health and the dashboard. The gthread worker serves every
+request on its own thread: one worker keeps many LLM calls in flight while
+cheap endpoints stay responsive.
+
+One worker is the default: threads already give the concurrency, and the
+LLM rate limiter is per process (its GROQ_RPM / GROQ_TPM budgets are split
+evenly across WEB_CONCURRENCY workers, see rate_limiter.from_env).
+
+Tune with environment variables:
+    WEB_CONCURRENCY   worker processes (default 1)
+    WEB_THREADS       threads per worker = concurrent requests (default 32)
+    WEB_TIMEOUT       seconds before a silent worker is restarted (default 180)
+    WEB_WORKER_CLASS  gunicorn worker class (default gthread)
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+worker_class = os.getenv("WEB_WORKER_CLASS", "gthread")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("WEB_THREADS", "32"))
+
+# Batch analyses and cover letters can legitimately take longer than
+# gunicorn's 30s default
+timeout = int(os.getenv("WEB_TIMEOUT", "180"))
+graceful_timeout = 30
+keepalive = 5
+
+# No preload: each worker opens its own SQLite connections after fork
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,149 @@
+"""
+HTTP Cache - Conditional GET, compression and per-version response bodies
+
+The dashboard auto-refreshes and clients poll the job APIs, but their data
+only changes on /save-results. ResponseCache.response() ties a response to the
+job store's version: it sets ETag / Last-Modified, answers 304 when the
+client already has that version, and otherwise serves the body serialized
+(and gzip/brotli-compressed above COMPRESS_MIN_BYTES) once per version and
+variant, from memory. An idle poll costs one version lookup and no
+rendering, serialization or body bytes.
+
+brotli is optional: it is used when the package is installed and the client
+accepts it, gzip otherwise.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "128"))
+
+
+def _encoding():
+    """Best encoding the client accepts ("br", "gzip" or None)"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, GZIP_LEVEL)
+    return body
+
+
+class ResponseCache:
+    """Serialized (and compressed) bodies by (variant, data version, encoding), LRU-bounded"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.hits = 0
+        self.renders = 0
+        self.bytes_saved = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def response(self, variant, revision, render, mimetype):
+        """
+        Response for the current request, revalidated against the data version
+
+        Args:
+            variant: What the body depends on besides the data (route, query string)
+            revision: (version, last write Unix timestamp) of the data
+            render: Function returning the body as str or bytes (only called on a miss)
+            mimetype: Content type of the body
+
+        Returns:
+            A 304 when the client's ETag / If-Modified-Since is current, else
+            the (possibly compressed) body with validators attached
+        """
+
+        version, modified = revision
+        etag = f"{version}.{modified}-{hashlib.sha1(variant.encode('utf-8')).hexdigest()[:12]}"
+        last_modified = datetime.fromtimestamp(modified, timezone.utc)
+
+        if request.if_none_match:
+            fresh = request.if_none_match.contains_weak(etag)
+        else:
+            since = request.if_modified_since
+            fresh = since is not None and since >= last_modified.replace(microsecond=0)
+
+        if fresh:
+            with self._lock:
+                self.not_modified += 1
+            response = Response(status=304)
+        else:
+            encoding = _encoding()
+            key = (variant, version, modified, encoding)
+            entry = self._get(key)
+            if entry is None:
+                body = render()
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                raw_size = len(body)
+                if encoding and raw_size >= COMPRESS_MIN_BYTES:
+                    body = compress(body, encoding)
+                else:
+                    encoding = None
+                entry = (body, encoding, raw_size)
+                with self._lock:
+                    self.renders += 1
+                self._put(key, entry)
+            body, used_encoding, raw_size = entry
+            with self._lock:
+                self.bytes_saved += raw_size - len(body)
+            response = Response(body, mimetype=mimetype)
+            if used_encoding:
+                response.headers["Content-Encoding"] = used_encoding
+
+        response.set_etag(etag, weak=True)
+        response.last_modified = last_modified
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "not_modified": self.not_modified,
+                "hits": self.hits,
+                "renders": self.renders,
+                "bytes_saved": self.bytes_saved,
+                "brotli": brotli is not None,
+            }
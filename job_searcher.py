@@ -3,19 +3,110 @@ Job Searcher - Automated job search using Adzuna API
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import argparse
 import os
+import sqlite3
 from dotenv import load_dotenv
 import json
-from datetime import datetime
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from disk_cache import DiskCache, make_key
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateDetector
+from seen_jobs import SeenJobIndex
 
 # Load environment variables
 load_dotenv()
 
+# Adzuna caps results_per_page at 50
+RESULTS_PER_PAGE = 50
+DEFAULT_MAX_PAGES = 10
+
+# HTTP statuses worth retrying (rate limiting and transient server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60
+
+# On-disk cache of raw Adzuna pages, so repeated runs don't re-spend quota
+CACHE_PATH = os.getenv(
+    "ADZUNA_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "adzuna_responses.sqlite3"),
+)
+DEFAULT_CACHE_TTL = 6 * 3600
+DEFAULT_CACHE_MAX_ENTRIES = 2000
+
+# Persistent index of already-emitted jobs for the incremental mode
+SEEN_JOBS_PATH = os.getenv(
+    "SEEN_JOBS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "seen_jobs.sqlite3"),
+)
+DEFAULT_SEEN_RETENTION_DAYS = 30
+
+# Sentinel pushed by a worker once its query has finished
+_QueryDone = namedtuple("_QueryDone", ["job_title", "location", "count", "duration"])
+
+
+def _is_older_than(job, cutoff):
+    """Check whether a job's created_date is before the cutoff datetime"""
+    created = job.get("created_date")
+    if not created:
+        return False
+    try:
+        created_at = datetime.fromisoformat(created.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at < cutoff
+
+
+def _parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _put_until_stopped(pages, item, stop):
+    """Put an item on the queue, giving up if the consumer has gone away"""
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
 
 class JobSearcher:
     """Searches for jobs using Adzuna API"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size=16,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_cap=8.0,
+        use_cache=True,
+        refresh_cache=False,
+        incremental=False,
+    ):
         self.adzuna_app_id = os.getenv("ADZUNA_APP_ID")
         self.adzuna_api_key = os.getenv("ADZUNA_API_KEY")
 
@@ -23,66 +114,268 @@ class JobSearcher:
             raise ValueError("Missing Adzuna API credentials in .env file!")
 
         self.base_url = "https://api.adzuna.com/v1/api/jobs"
+
+        # One keep-alive session shared by all queries (and threads), so
+        # consecutive pages reuse TCP/TLS connections instead of reconnecting
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._stats_lock = threading.Lock()
+        self.http_stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+
+        # refresh_cache skips cache reads but still stores fresh responses
+        self.refresh_cache = refresh_cache
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = DiskCache(
+                    CACHE_PATH, ttl=DEFAULT_CACHE_TTL, max_entries=DEFAULT_CACHE_MAX_ENTRIES
+                )
+            except sqlite3.Error as e:
+                print(f"⚠️  Response cache disabled: {e}")
+
+        # Incremental mode only emits jobs missing from the seen-job index
+        self.incremental = incremental
+
         print(f"✅ JobSearcher initialized with app_id: {self.adzuna_app_id[:8]}...")
 
-    def search_adzuna(self, job_title, location, max_results=20, country="fr"):
+    def _get_json(self, url, params):
+        """
+        GET a JSON document through the pooled session, retrying transient errors
+
+        Connection errors, timeouts and RETRY_STATUSES responses are retried up
+        to max_retries times with exponential backoff and full jitter. A 429
+        with a Retry-After header waits for the delay the server asked for.
+
+        Raises:
+            requests.exceptions.RequestException once retries are exhausted
+        """
+
+        for attempt in range(self.max_retries + 1):
+            self._count("requests")
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, timeout=10)
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    if response.status_code == 429:
+                        self._count("rate_limited")
+                        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    raise requests.exceptions.HTTPError(
+                        f"{response.status_code} from Adzuna", response=response
+                    )
+                response.raise_for_status()
+                return response.json()
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.HTTPError,
+            ) as e:
+                status = getattr(e.response, "status_code", None)
+                retryable = status is None or status in RETRY_STATUSES
+                if not retryable or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+
+                if retry_after is not None:
+                    delay = min(retry_after, MAX_RETRY_AFTER)
+                else:
+                    delay = random.uniform(
+                        0, min(self.backoff_cap, self.backoff_base * 2**attempt)
+                    )
+                self._count("retries")
+                print(f"   🔁 Retry {attempt + 1}/{self.max_retries} in {delay:.1f}s ({e})")
+                time.sleep(delay)
+
+    def _fetch_page(self, url, params, cache_key):
+        """Fetch one search page, going through the response cache when enabled"""
+
+        if self.cache is not None and not self.refresh_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        data = self._get_json(url, params)
+        if self.cache is not None:
+            self.cache.set(cache_key, data)
+        return data
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.http_stats[name] += 1
+
+    def connection_stats(self):
+        """
+        Summarize HTTP activity for this searcher
+
+        Returns:
+            dict with request/retry counts plus how many requests went over
+            a reused keep-alive connection versus a freshly opened one
+        """
+
+        opened = 0
+        served = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                served += pool.num_requests
+
+        with self._stats_lock:
+            stats = dict(self.http_stats)
+        stats["connections_opened"] = opened
+        stats["connections_reused"] = max(0, served - opened)
+        return stats
+
+    def search_adzuna(self, job_title, location, max_results=20, country="fr", **options):
         """
         Search jobs on Adzuna
 
         Args:
             job_title: Job title to search for (e.g., "Data Scientist")
             location: Location to search in (e.g., "Paris")
-            max_results: Maximum number of results to return
+            max_results: Maximum number of results to return (None = all pages)
             country: Country code (fr, us, gb, etc.)
+            **options: Extra pagination options passed to iter_adzuna_pages
 
         Returns:
             List of job dictionaries
         """
 
-        url = f"{self.base_url}/{country}/search/1"
+        jobs = []
+        for page in self.iter_adzuna_pages(
+            job_title, location, max_results=max_results, country=country, **options
+        ):
+            jobs.extend(page)
+        return jobs
+
+    def iter_adzuna_pages(
+        self,
+        job_title,
+        location,
+        max_results=20,
+        country="fr",
+        results_per_page=RESULTS_PER_PAGE,
+        max_pages=DEFAULT_MAX_PAGES,
+        max_days_old=None,
+        seen_urls=None,
+        seen_index=None,
+    ):
+        """
+        Search jobs on Adzuna, yielding one page of jobs at a time
 
-        params = {
-            "app_id": self.adzuna_app_id,
-            "app_key": self.adzuna_api_key,
-            "results_per_page": min(max_results, 50),  # Max 50
-            "what": job_title,
-            "where": location,
-            "content-type": "application/json",
-        }
+        Pages are only requested while they are still useful: iteration stops
+        at the first empty page, or, when results are sorted by date (newest
+        first, whenever max_days_old or seen_index is given), at the first
+        page whose URLs have all been seen already or once postings older
+        than max_days_old start showing up.
 
-        try:
-            print(f"🔍 Searching: {job_title} in {location}...")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            jobs = []
-            for result in data.get("results", []):
-                job = {
-                    "job_title": result.get("title", ""),
-                    "company": result.get("company", {}).get("display_name", "Unknown"),
-                    "location": result.get("location", {}).get(
-                        "display_name", location
-                    ),
-                    "job_description": result.get("description", ""),
-                    "job_url": result.get("redirect_url", ""),
-                    "salary_min": result.get("salary_min"),
-                    "salary_max": result.get("salary_max"),
-                    "created_date": result.get("created"),
-                    "source": "Adzuna",
-                    "category": result.get("category", {}).get("label", ""),
-                }
-                jobs.append(job)
-
-            print(f"   ✅ Found {len(jobs)} jobs")
-            return jobs
-
-        except requests.exceptions.RequestException as e:
-            print(f"   ❌ Error searching Adzuna: {e}")
-            return []
-        except Exception as e:
-            print(f"   ❌ Unexpected error: {e}")
-            return []
+        Args:
+            job_title: Job title to search for (e.g., "Data Scientist")
+            location: Location to search in (e.g., "Paris")
+            max_results: Maximum number of jobs to yield (None = no limit)
+            country: Country code (fr, us, gb, etc.)
+            results_per_page: Page size requested from Adzuna (max 50)
+            max_pages: Hard cap on the number of pages requested
+            max_days_old: Skip postings older than this many days
+            seen_urls: Optional set of job URLs already collected elsewhere
+            seen_index: Optional SeenJobIndex of jobs emitted by earlier runs
+
+        Yields:
+            Lists of job dictionaries, one list per page
+        """
+
+        if seen_urls is None:
+            seen_urls = set()
+
+        per_page = min(results_per_page, RESULTS_PER_PAGE)
+        if max_results is not None:
+            per_page = max(1, min(per_page, max_results))
+
+        cutoff = None
+        if max_days_old is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=max_days_old)
+
+        # Stopping at old or already-seen postings is only safe newest-first;
+        # with relevance ordering new postings can sit on any page
+        date_sorted = max_days_old is not None or seen_index is not None
+
+        print(f"🔍 Searching: {job_title} in {location}...")
+        yielded = 0
+        own_urls = set()
+
+        for page_number in range(1, max_pages + 1):
+            url = f"{self.base_url}/{country}/search/{page_number}"
+
+            params = {
+                "app_id": self.adzuna_app_id,
+                "app_key": self.adzuna_api_key,
+                "results_per_page": per_page,
+                "what": job_title,
+                "where": location,
+                "content-type": "application/json",
+            }
+            if max_days_old is not None:
+                params["max_days_old"] = max_days_old
+            if date_sorted:
+                params["sort_by"] = "date"
+
+            cache_key = make_key(
+                country, job_title, location, page_number, per_page, max_days_old, date_sorted
+            )
+
+            try:
+                data = self._fetch_page(url, params, cache_key)
+            except requests.exceptions.RequestException as e:
+                print(f"   ❌ Error searching Adzuna (page {page_number}): {e}")
+                return
+            except Exception as e:
+                print(f"   ❌ Unexpected error (page {page_number}): {e}")
+                return
+
+            results = data.get("results", [])
+            if not results:
+                break
+
+            jobs = [self._parse_result(result, location) for result in results]
+
+            too_old = False
+            if cutoff is not None:
+                fresh_jobs = [job for job in jobs if not _is_older_than(job, cutoff)]
+                too_old = len(fresh_jobs) < len(jobs)
+                jobs = fresh_jobs
+
+            if date_sorted and jobs and all(
+                job["job_url"] in seen_urls
+                or job["job_url"] in own_urls
+                or (seen_index is not None and job in seen_index)
+                for job in jobs
+            ):
+                print(f"   ⏹️  Page {page_number} only has already-seen jobs, stopping")
+                break
+
+            if max_results is not None:
+                jobs = jobs[: max_results - yielded]
+
+            if jobs:
+                own_urls.update(job["job_url"] for job in jobs)
+                yielded += len(jobs)
+                print(f"   ✅ Page {page_number}: {len(jobs)} jobs")
+                yield jobs
+
+            if too_old:
+                print(f"   ⏹️  Postings older than {max_days_old} days reached, stopping")
+                break
+            if max_results is not None and yielded >= max_results:
+                break
+            if len(results) < per_page:
+                break
 
     def search_all_criteria(self, config_file="search_config.json"):
         """
@@ -95,6 +388,32 @@ class JobSearcher:
             List of unique jobs
         """
 
+        return list(self.iter_all_criteria(config_file))
+
+    def iter_all_criteria(self, config_file="search_config.json"):
+        """
+        Search all job titles and locations, streaming unique jobs
+
+        Jobs are yielded as soon as their page arrives and has been
+        deduplicated by URL, so callers can start analyzing the first jobs
+        while the remaining queries are still in flight.
+
+        Jobs whose title + company + description are near-duplicates of an
+        earlier job (SimHash similarity >= near_duplicate_threshold, null to
+        disable) are collapsed onto it; the canonical job lists the other
+        URLs in alternate_urls.
+
+        In incremental mode (constructor flag or "incremental" in the config)
+        jobs already recorded in the seen-job index are skipped, and the jobs
+        emitted are added to the index once the search completes.
+
+        Args:
+            config_file: Path to JSON config with job_titles and locations
+
+        Yields:
+            Unique job dictionaries
+        """
+
         # Check if config file exists
         if not os.path.exists(config_file):
             print(f"❌ Config file not found: {config_file}")
@@ -111,31 +430,164 @@ class JobSearcher:
         print(f"   Locations: {', '.join(config['locations'])}")
         print("=" * 60)
 
-        all_jobs = []
-
-        for job_title in config["job_titles"]:
-            for location in config["locations"]:
-                jobs = self.search_adzuna(
-                    job_title=job_title,
-                    location=location,
-                    max_results=config.get("max_results_per_search", 20),
+        queries = [
+            (job_title, location)
+            for job_title in config["job_titles"]
+            for location in config["locations"]
+        ]
+        options = {
+            "max_results": config.get("max_results_per_search", 20),
+            "results_per_page": config.get("results_per_page", RESULTS_PER_PAGE),
+            "max_pages": config.get("max_pages_per_search", DEFAULT_MAX_PAGES),
+            "max_days_old": config.get("max_days_old"),
+        }
+        max_concurrency = max(1, int(config.get("max_concurrency", 1)))
+
+        if self.cache is not None:
+            self.cache.ttl = config.get("cache_ttl_seconds", self.cache.ttl)
+            self.cache.max_entries = config.get("cache_max_entries", self.cache.max_entries)
+
+        near_duplicates = None
+        threshold = config.get("near_duplicate_threshold", DEFAULT_THRESHOLD)
+        if threshold is not None:
+            near_duplicates = NearDuplicateDetector(threshold)
+
+        seen_index = None
+        if self.incremental or config.get("incremental", False):
+            seen_index = SeenJobIndex(
+                SEEN_JOBS_PATH,
+                retention_days=config.get("seen_retention_days", DEFAULT_SEEN_RETENTION_DAYS),
+            )
+            options["seen_index"] = seen_index
+            print(
+                f"   Incremental mode: {len(seen_index)} jobs already seen"
+                f" ({seen_index.pruned} pruned)"
+            )
+
+        started = time.perf_counter()
+        unique_urls = set()
+        total_jobs = 0
+        already_seen = 0
+        new_jobs = []
+        timings = {}
+
+        # Workers push pages into a bounded queue so a slow consumer applies
+        # backpressure instead of letting every page pile up in memory
+        pages = queue.Queue(maxsize=max_concurrency * 2)
+        stop = threading.Event()
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            for job_title, location in queries:
+                executor.submit(
+                    self._run_query, job_title, location, options, unique_urls, pages, stop
                 )
-                all_jobs.extend(jobs)
 
-        # Remove duplicates by URL
-        unique_jobs = {}
-        for job in all_jobs:
-            url = job.get("job_url")
-            if url and url not in unique_jobs:
-                unique_jobs[url] = job
+            remaining = len(queries)
+            while remaining:
+                item = pages.get()
+                if isinstance(item, _QueryDone):
+                    timings[(item.job_title, item.location)] = item
+                    remaining -= 1
+                    continue
+
+                total_jobs += len(item)
+                for job in item:
+                    url = job.get("job_url")
+                    if url and url not in unique_urls:
+                        unique_urls.add(url)
+                        if near_duplicates is not None and near_duplicates.add(job):
+                            continue
+                        if seen_index is not None:
+                            if job in seen_index:
+                                already_seen += 1
+                                continue
+                            new_jobs.append(job)
+                        yield job
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        # Only record jobs once the whole run has been consumed, so an
+        # interrupted run re-emits them next time
+        if seen_index is not None:
+            seen_index.add(new_jobs)
+
+        elapsed = time.perf_counter() - started
 
         print("=" * 60)
         print(f"✅ Search Complete!")
-        print(f"   Total jobs found: {len(all_jobs)}")
-        print(f"   Unique jobs: {len(unique_jobs)}")
+        print(f"   Total jobs found: {total_jobs}")
+        print(f"   Unique jobs: {len(unique_urls)}")
+        if near_duplicates is not None:
+            print(
+                f"   Near-duplicates collapsed: {near_duplicates.duplicates}"
+                f" (LLM calls saved: {near_duplicates.duplicates})"
+            )
+        if seen_index is not None:
+            print(f"   New jobs: {len(new_jobs)} ({already_seen} already seen)")
+        print(f"   Queries: {len(queries)} (max concurrency: {max_concurrency})")
+        for job_title, location in queries:
+            done = timings.get((job_title, location))
+            if done:
+                print(
+                    f"   ⏱️  {job_title} / {location}: {done.count} jobs"
+                    f" in {done.duration:.2f}s"
+                )
+        print(f"   Wall-clock search time: {elapsed:.2f}s")
+        http = self.connection_stats()
+        print(
+            f"   HTTP: {http['requests']} requests, {http['retries']} retries"
+            f" ({http['rate_limited']} rate-limited), {http['failures']} failed"
+        )
+        print(
+            f"   Connections: {http['connections_opened']} opened,"
+            f" {http['connections_reused']} reused"
+        )
+        if self.cache is not None:
+            cache = self.cache.stats()
+            mode = "refresh" if self.refresh_cache else "on"
+            print(
+                f"   Cache ({mode}): {cache['hits']} hits, {cache['misses']} misses,"
+                f" {cache['size']} entries"
+            )
+        else:
+            print("   Cache: off")
         print("=" * 60)
 
-        return list(unique_jobs.values())
+    def _run_query(self, job_title, location, options, seen_urls, pages, stop):
+        """Stream one Adzuna query into the shared page queue"""
+
+        started = time.perf_counter()
+        count = 0
+        try:
+            for page in self.iter_adzuna_pages(
+                job_title, location, seen_urls=seen_urls, **options
+            ):
+                if not _put_until_stopped(pages, page, stop):
+                    return
+                count += len(page)
+        finally:
+            done = _QueryDone(job_title, location, count, time.perf_counter() - started)
+            _put_until_stopped(pages, done, stop)
+
+    @staticmethod
+    def _parse_result(result, location):
+        """Convert a raw Adzuna result into our job dictionary"""
+
+        return {
+            "job_id": result.get("id"),
+            "job_title": result.get("title", ""),
+            "company": result.get("company", {}).get("display_name", "Unknown"),
+            "location": result.get("location", {}).get("display_name", location),
+            "job_description": result.get("description", ""),
+            "job_url": result.get("redirect_url", ""),
+            "salary_min": result.get("salary_min"),
+            "salary_max": result.get("salary_max"),
+            "created_date": result.get("created"),
+            "source": "Adzuna",
+            "category": result.get("category", {}).get("label", ""),
+        }
 
     def _create_default_config(self, config_file):
         """Create a default search configuration file"""
@@ -148,6 +600,14 @@ class JobSearcher:
             ],
             "locations": ["Paris", "Remote"],
             "max_results_per_search": 10,
+            "max_pages_per_search": DEFAULT_MAX_PAGES,
+            "max_days_old": None,
+            "max_concurrency": 4,
+            "near_duplicate_threshold": DEFAULT_THRESHOLD,
+            "cache_ttl_seconds": DEFAULT_CACHE_TTL,
+            "cache_max_entries": DEFAULT_CACHE_MAX_ENTRIES,
+            "incremental": False,
+            "seen_retention_days": DEFAULT_SEEN_RETENTION_DAYS,
         }
 
         with open(config_file, "w") as f:
@@ -160,13 +620,33 @@ class JobSearcher:
 def main():
     """Main function to test job search"""
 
+    parser = argparse.ArgumentParser(description="Search Adzuna for jobs")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Bypass the on-disk response cache"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached responses but store the fresh ones",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only return jobs not seen in previous runs",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("🤖 AI Job Agent - Job Searcher")
     print("=" * 60)
 
     try:
         # Initialize searcher
-        searcher = JobSearcher()
+        searcher = JobSearcher(
+            use_cache=not args.no_cache,
+            refresh_cache=args.refresh,
+            incremental=args.incremental,
+        )
 
         # Search for jobs
         jobs = searcher.search_all_criteria()
@@ -0,0 +1,84 @@
+"""
+Job Snapshot - Process-wide view of what the dashboard shows
+
+The dashboard and the cover letter routes need the best jobs and the store
+statistics, but their data only changes on /save-results. JobSnapshots keeps
+one immutable snapshot per process - the top `top_n` jobs, read through the
+score index, and the aggregate statistics - and only rebuilds it when the
+store's version counter moves, i.e. after a /save-results in any worker. The
+no-change case costs one indexed lookup, and a rebuild reads top_n rows plus
+the aggregates, whatever the number of jobs in the store.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class JobSnapshot:
+    """Best jobs and statistics of one store version (treat as read-only)"""
+
+    def __init__(self, version, jobs, statistics):
+        self.version = version
+        self.jobs = jobs
+        self.statistics = statistics
+        self.loaded_at = datetime.now(timezone.utc)
+
+
+class JobSnapshots:
+    """Current JobSnapshot of a JobStore, rebuilt when the store changes"""
+
+    def __init__(self, store, top_n):
+        self.store = store
+        self.top_n = top_n
+        self._current = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.hits = 0
+        self.reload_seconds = 0.0
+        self.last_reload_seconds = 0.0
+
+    def _load(self):
+        # One read transaction, so the jobs and statistics match the version
+        with self.store.read_transaction():
+            version = self.store.version()
+            jobs, _ = self.store.query(sort="score", limit=self.top_n)
+            statistics = self.store.statistics()
+        return JobSnapshot(version, tuple(jobs), statistics)
+
+    def get(self):
+        """The snapshot for the store's current version (reloaded if stale)"""
+        version = self.store.version()
+        snapshot = self._current
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while this one waited
+            snapshot = self._current
+            if snapshot is not None and snapshot.version >= version:
+                self.hits += 1
+                return snapshot
+
+            started = time.perf_counter()
+            snapshot = self._load()
+            elapsed = time.perf_counter() - started
+            self._current = snapshot
+            self.reloads += 1
+            self.reload_seconds += elapsed
+            self.last_reload_seconds = elapsed
+        print(f"Reloaded {len(snapshot.jobs)} jobs (store version {snapshot.version}) in {elapsed:.3f}s")
+        return snapshot
+
+    def stats(self):
+        snapshot = self._current
+        return {
+            "version": snapshot.version if snapshot else None,
+            "jobs": len(snapshot.jobs) if snapshot else 0,
+            "loaded_at": snapshot.loaded_at.isoformat() if snapshot else None,
+            "hits": self.hits,
+            "reloads": self.reloads,
+            "reload_seconds": round(self.reload_seconds, 4),
+            "last_reload_seconds": round(self.last_reload_seconds, 4),
+        }
@@ -0,0 +1,654 @@
+"""
+Job Store - SQLite store of analyzed jobs
+
+Replaces the job_results.json blob that /save-results used to overwrite:
+jobs are upserted by a stable ID (so history accumulates across runs), score
+breakdowns and skills get real columns/tables, and the columns the dashboard
+filters and sorts on are indexed. Every job's full JSON is kept too, so
+fields the store doesn't model survive a round trip.
+
+Dashboard statistics (totals, priority buckets, score histogram, breakdown
+sums) and skill frequencies are kept in aggregate tables that every upsert
+adjusts by the difference between the old and new version of each job, so
+reading them doesn't scan the jobs; check_aggregates() recomputes them from
+scratch to verify.
+
+Like the caches, the database runs in WAL mode and can be shared by several
+gunicorn workers.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Flat n8n field -> /analyze-fit breakdown key
+BREAKDOWN_FIELDS = {
+    "skills_match_score": "skills_match",
+    "experience_score": "experience_level",
+    "domain_score": "domain_industry",
+    "other_score": "other_factors",
+}
+
+# Dashboard priority buckets, by overall score
+HIGH_PRIORITY_SCORE = 75
+MEDIUM_PRIORITY_SCORE = 65
+
+# Running totals kept in job_aggregates
+AGGREGATES = ("jobs", "scored", "score_sum", "high", "medium", "low") + tuple(
+    f"{column}_sum" for column in BREAKDOWN_FIELDS
+)
+# Score histogram bucket width (the last bucket also holds 100)
+SCORE_BUCKET = 10
+
+# /api/jobs sort keys -> never-NULL SQL expressions (indexed together with id)
+SORT_KEYS = {
+    "score": "COALESCE(overall_score, -1)",
+    "analyzed_at": "COALESCE(analyzed_at, '')",
+    "company": "COALESCE(company, '')",
+    "title": "COALESCE(title, '')",
+}
+SKILL_KINDS = ("matching", "missing")
+
+_ADZUNA_AD = re.compile(r"adzuna\.[a-z.]+/(?:land/)?(?:ad|details)/(\d+)")
+
+
+def _with_analysis(item):
+    """An item carrying a fit analysis, flattened; None for anything else"""
+    if not isinstance(item, dict):
+        return None
+    if isinstance(item.get("analysis"), dict):
+        # /analyze-fit/batch result items: {"index", "status", "analysis": {...}}
+        rest = {key: value for key, value in item.items() if key not in ("analysis", "index", "status")}
+        item = {**rest, **item["analysis"]}
+    if item.get("overall_score") is None and item.get("fit_score") is None:
+        return None
+    return item
+
+
+def extract_jobs(payload):
+    """
+    The analyzed jobs in a /save-results payload or a legacy job_results.json
+
+    Accepts [{"json": {"data": [...]}}], [{"data": [...]}], {"data": [...]}
+    and a plain list. Only entries carrying an analysis (overall_score,
+    fit_score or an "analysis" object) count as jobs: raw search results,
+    which job_searcher also writes to job_results.json, are skipped.
+
+    Returns:
+        (jobs, skipped) where skipped counts the entries without an analysis
+    """
+
+    if isinstance(payload, dict):
+        payload = payload.get("jobs") or payload.get("data") or payload.get("json") or []
+        if isinstance(payload, dict):
+            payload = payload.get("data") or []
+    if not isinstance(payload, list) or not payload:
+        return [], 0
+
+    first = payload[0]
+    if isinstance(first, dict) and isinstance(first.get("json"), dict):
+        items = [job for item in payload for job in (item.get("json") or {}).get("data") or []]
+    elif isinstance(first, dict) and isinstance(first.get("data"), list):
+        items = [job for item in payload for job in item.get("data") or []]
+    else:
+        items = payload
+
+    jobs = [job for job in map(_with_analysis, items) if job is not None]
+    return jobs, len(items) - len(jobs)
+
+
+def stable_job_id(job):
+    """
+    Identity of a job across runs
+
+    Uses the Adzuna ID (job_id field or the ad number in its URL) when there
+    is one, else a hash of title, company and location.
+    """
+
+    if job.get("job_id"):
+        return f"{str(job.get('source') or 'adzuna').lower()}:{job['job_id']}"
+    url = str(job.get("url") or job.get("job_url") or "")
+    match = _ADZUNA_AD.search(url)
+    if match:
+        return f"adzuna:{match.group(1)}"
+    identity = "|".join(
+        " ".join(str(job.get(field) or "").lower().split())
+        for field in ("title", "company", "location")
+    )
+    return "hash:" + hashlib.sha1(identity.encode("utf-8")).hexdigest()[:20]
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None and value != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _skills(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(skill).strip() for skill in value or [] if str(skill).strip()]
+
+
+def normalize_job(job):
+    """Flatten a saved job (n8n shape or /analyze-fit shape) into the stored fields"""
+    job = dict(job)
+    job_data = job.get("job_data") if isinstance(job.get("job_data"), dict) else {}
+    job.setdefault("title", job.get("job_title") or job_data.get("title"))
+    job.setdefault("company", job_data.get("company"))
+    job.setdefault("location", job_data.get("location"))
+    job.setdefault("url", job.get("job_url") or job_data.get("url"))
+    if job.get("overall_score") is None:
+        job["overall_score"] = job.get("fit_score")
+
+    breakdown = job.get("breakdown") if isinstance(job.get("breakdown"), dict) else {}
+    for field, key in BREAKDOWN_FIELDS.items():
+        if job.get(field) is None and key in breakdown:
+            job[field] = breakdown[key]
+
+    job["matching_skills"] = _skills(job.get("matching_skills"))
+    job["missing_skills"] = _skills(job.get("missing_skills"))
+    job["id"] = stable_job_id(job)
+    return job
+
+
+def _score_bucket(score):
+    return min(int(score / SCORE_BUCKET), 100 // SCORE_BUCKET - 1) * SCORE_BUCKET
+
+
+def _contribution(row):
+    """What one stored job adds to the aggregates and to which histogram bucket"""
+    values = {"jobs": 1}
+    for column in BREAKDOWN_FIELDS:
+        values[f"{column}_sum"] = row[column] or 0
+    score = row["overall_score"]
+    if score is None:
+        return values, None
+    values.update(
+        scored=1,
+        score_sum=score,
+        high=int(score >= HIGH_PRIORITY_SCORE),
+        medium=int(MEDIUM_PRIORITY_SCORE <= score < HIGH_PRIORITY_SCORE),
+        low=int(score < MEDIUM_PRIORITY_SCORE),
+    )
+    return values, _score_bucket(score)
+
+
+def _encode_cursor(value, job_id):
+    raw = json.dumps([value, job_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, job_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    # Sort values are numbers or strings (SORT_KEYS coalesce NULLs), IDs strings
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)) or not isinstance(job_id, str):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return value, job_id
+
+
+class JobStore:
+    """Analyzed jobs in SQLite, upserted by stable ID"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: SQLite file to use (parent directories are created)
+        """
+
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                url TEXT,
+                overall_score REAL,
+                priority TEXT,
+                should_apply INTEGER,
+                skills_match_score REAL,
+                experience_score REAL,
+                domain_score REAL,
+                other_score REAL,
+                recommendation TEXT,
+                analyzed_at TEXT,
+                first_saved_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_score ON jobs(overall_score);
+            CREATE INDEX IF NOT EXISTS idx_jobs_priority ON jobs(priority);
+            CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
+            CREATE INDEX IF NOT EXISTS idx_jobs_analyzed_at ON jobs(analyzed_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_sort_score ON jobs(COALESCE(overall_score, -1), id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_sort_analyzed_at ON jobs(COALESCE(analyzed_at, ''), id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_sort_company ON jobs(COALESCE(company, ''), id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_sort_title ON jobs(COALESCE(title, ''), id);
+
+            CREATE TABLE IF NOT EXISTS job_skills (
+                job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+                kind TEXT NOT NULL CHECK (kind IN ('matching', 'missing')),
+                skill TEXT NOT NULL,
+                PRIMARY KEY (job_id, kind, skill)
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills(kind, skill);
+            CREATE INDEX IF NOT EXISTS idx_job_skills_skill_nocase ON job_skills(skill COLLATE NOCASE, kind);
+
+            CREATE TABLE IF NOT EXISTS job_aggregates (name TEXT PRIMARY KEY, value REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS score_histogram (bucket INTEGER PRIMARY KEY, jobs INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS skill_counts (
+                kind TEXT NOT NULL,
+                skill TEXT NOT NULL,
+                jobs INTEGER NOT NULL,
+                PRIMARY KEY (kind, skill)
+            );
+            CREATE INDEX IF NOT EXISTS idx_skill_counts_rank ON skill_counts(kind, jobs DESC, skill);
+
+            CREATE TABLE IF NOT EXISTS store_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO store_meta VALUES ('version', 0);
+            INSERT OR IGNORE INTO store_meta VALUES ('aggregates', 0);
+            INSERT OR IGNORE INTO store_meta VALUES ('modified', CAST(strftime('%s', 'now') AS INTEGER));
+            """
+        )
+        conn.commit()
+
+        # Stores created before the aggregate tables existed
+        if not conn.execute("SELECT value FROM store_meta WHERE name = 'aggregates'").fetchone()[0]:
+            self.rebuild_aggregates()
+
+    def _connect(self):
+        """Return this thread's connection (sqlite3 connections are per-thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def upsert_many(self, jobs):
+        """
+        Insert new jobs and update known ones (matched by stable ID)
+
+        Returns:
+            (inserted, updated) counts
+        """
+
+        now = datetime.now(timezone.utc).isoformat()
+        conn = self._connect()
+        inserted = updated = 0
+        totals, histogram, skills = {}, {}, {}
+        with conn:
+            # Reserve the write lock first, so the old rows read below can't
+            # change (in another worker) before the aggregates are adjusted
+            conn.execute("BEGIN IMMEDIATE")
+            for raw in jobs:
+                if not isinstance(raw, dict):
+                    continue
+                job = normalize_job(raw)
+                old = conn.execute(
+                    f"SELECT overall_score, {', '.join(BREAKDOWN_FIELDS)} FROM jobs WHERE id = ?", (job["id"],)
+                ).fetchone()
+                if old:
+                    self._add_contribution(old, -1, totals, histogram)
+                    for row in conn.execute("SELECT kind, skill FROM job_skills WHERE job_id = ?", (job["id"],)):
+                        key = (row["kind"], row["skill"])
+                        skills[key] = skills.get(key, 0) - 1
+                should_apply = job.get("should_apply")
+                conn.execute(
+                    """
+                    INSERT INTO jobs (id, title, company, location, url, overall_score, priority,
+                                      should_apply, skills_match_score, experience_score, domain_score,
+                                      other_score, recommendation, analyzed_at, first_saved_at,
+                                      updated_at, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        title = excluded.title, company = excluded.company,
+                        location = excluded.location, url = excluded.url,
+                        overall_score = excluded.overall_score, priority = excluded.priority,
+                        should_apply = excluded.should_apply,
+                        skills_match_score = excluded.skills_match_score,
+                        experience_score = excluded.experience_score,
+                        domain_score = excluded.domain_score, other_score = excluded.other_score,
+                        recommendation = excluded.recommendation,
+                        analyzed_at = excluded.analyzed_at, updated_at = excluded.updated_at,
+                        data = excluded.data
+                    """,
+                    (
+                        job["id"], job.get("title"), job.get("company"), job.get("location"),
+                        job.get("url"), _number(job.get("overall_score")), job.get("priority"),
+                        None if should_apply is None else int(bool(should_apply)),
+                        _number(job.get("skills_match_score")), _number(job.get("experience_score")),
+                        _number(job.get("domain_score")), _number(job.get("other_score")),
+                        job.get("recommendation"), job.get("analyzed_at") or now, now, now,
+                        json.dumps(job, ensure_ascii=False),
+                    ),
+                )
+                conn.execute("DELETE FROM job_skills WHERE job_id = ?", (job["id"],))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO job_skills (job_id, kind, skill) VALUES (?, ?, ?)",
+                    [(job["id"], "matching", skill) for skill in job["matching_skills"]]
+                    + [(job["id"], "missing", skill) for skill in job["missing_skills"]],
+                )
+                new = {column: _number(job.get(column)) for column in ("overall_score", *BREAKDOWN_FIELDS)}
+                self._add_contribution(new, 1, totals, histogram)
+                for kind in SKILL_KINDS:
+                    for skill in set(job[f"{kind}_skills"]):
+                        skills[(kind, skill)] = skills.get((kind, skill), 0) + 1
+
+                if old:
+                    updated += 1
+                else:
+                    inserted += 1
+            if inserted or updated:
+                self._apply_aggregates(conn, totals, histogram, skills)
+                self._bump_version(conn)
+        return inserted, updated
+
+    @staticmethod
+    def _add_contribution(row, sign, totals, histogram):
+        values, bucket = _contribution(row)
+        for name, value in values.items():
+            totals[name] = totals.get(name, 0) + sign * value
+        if bucket is not None:
+            histogram[bucket] = histogram.get(bucket, 0) + sign
+
+    @staticmethod
+    def _apply_aggregates(conn, totals, histogram, skills):
+        """Add the deltas collected by upsert_many (inside its transaction)"""
+        conn.executemany(
+            """
+            INSERT INTO job_aggregates (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+            """,
+            [(name, delta) for name, delta in totals.items() if delta],
+        )
+        conn.executemany(
+            """
+            INSERT INTO score_histogram (bucket, jobs) VALUES (?, ?)
+            ON CONFLICT(bucket) DO UPDATE SET jobs = jobs + excluded.jobs
+            """,
+            [(bucket, delta) for bucket, delta in histogram.items() if delta],
+        )
+        conn.executemany(
+            """
+            INSERT INTO skill_counts (kind, skill, jobs) VALUES (?, ?, ?)
+            ON CONFLICT(kind, skill) DO UPDATE SET jobs = jobs + excluded.jobs
+            """,
+            [(kind, skill, delta) for (kind, skill), delta in skills.items() if delta],
+        )
+        conn.execute("DELETE FROM score_histogram WHERE jobs <= 0")
+        conn.execute("DELETE FROM skill_counts WHERE jobs <= 0")
+
+    def _recompute_aggregates(self):
+        """Aggregates computed from scratch over jobs and job_skills"""
+        conn = self._connect()
+        breakdown_sums = ", ".join(f"SUM(COALESCE({column}, 0)) AS {column}_sum" for column in BREAKDOWN_FIELDS)
+        row = conn.execute(
+            f"""
+            SELECT COUNT(*) AS jobs,
+                   COUNT(overall_score) AS scored,
+                   COALESCE(SUM(overall_score), 0) AS score_sum,
+                   COALESCE(SUM(overall_score >= :high), 0) AS high,
+                   COALESCE(SUM(overall_score >= :medium AND overall_score < :high), 0) AS medium,
+                   COALESCE(SUM(overall_score < :medium), 0) AS low,
+                   {breakdown_sums}
+            FROM jobs
+            """,
+            {"high": HIGH_PRIORITY_SCORE, "medium": MEDIUM_PRIORITY_SCORE},
+        ).fetchone()
+        totals = {name: row[name] or 0 for name in AGGREGATES}
+        histogram = {
+            row["bucket"]: row["n"]
+            for row in conn.execute(
+                f"""
+                SELECT MIN(CAST(overall_score / {SCORE_BUCKET} AS INTEGER), {100 // SCORE_BUCKET - 1})
+                       * {SCORE_BUCKET} AS bucket, COUNT(*) AS n
+                FROM jobs WHERE overall_score IS NOT NULL GROUP BY bucket
+                """
+            )
+        }
+        skills = {
+            (row["kind"], row["skill"]): row["n"]
+            for row in conn.execute("SELECT kind, skill, COUNT(*) AS n FROM job_skills GROUP BY kind, skill")
+        }
+        return totals, histogram, skills
+
+    def _stored_aggregates(self, with_skills=True):
+        conn = self._connect()
+        totals = {name: 0 for name in AGGREGATES}
+        totals.update({row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM job_aggregates")})
+        histogram = {row["bucket"]: row["jobs"] for row in conn.execute("SELECT bucket, jobs FROM score_histogram")}
+        if not with_skills:
+            return totals, histogram, None
+        skills = {
+            (row["kind"], row["skill"]): row["jobs"]
+            for row in conn.execute("SELECT kind, skill, jobs FROM skill_counts")
+        }
+        return totals, histogram, skills
+
+    def check_aggregates(self):
+        """
+        Compare the maintained aggregates with a from-scratch recomputation
+
+        Returns:
+            {"consistent": bool, "differences": {name: {"stored": x, "recomputed": y}}}
+        """
+
+        with self.read_transaction():
+            stored = self._stored_aggregates()
+            recomputed = self._recompute_aggregates()
+
+        differences = {}
+        for label, maintained, expected in zip(("totals", "histogram", "skills"), stored, recomputed):
+            for key in set(maintained) | set(expected):
+                a, b = maintained.get(key, 0), expected.get(key, 0)
+                if abs(a - b) > 1e-6:
+                    name = f"{label}:{':'.join(key) if isinstance(key, tuple) else key}"
+                    differences[name] = {"stored": a, "recomputed": b}
+        return {"consistent": not differences, "differences": differences}
+
+    def rebuild_aggregates(self):
+        """Replace the aggregates with a from-scratch recomputation"""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            totals, histogram, skills = self._recompute_aggregates()
+            conn.execute("DELETE FROM job_aggregates")
+            conn.execute("DELETE FROM score_histogram")
+            conn.execute("DELETE FROM skill_counts")
+            self._apply_aggregates(conn, totals, histogram, skills)
+            conn.execute("UPDATE store_meta SET value = 1 WHERE name = 'aggregates'")
+            self._bump_version(conn)
+
+    def import_file(self, path):
+        """Load a legacy job_results.json (any of its nesting shapes)"""
+        with open(path, "r") as f:
+            jobs, skipped = extract_jobs(json.load(f))
+        inserted, updated = self.upsert_many(jobs)
+        print(f"Imported {inserted} new / {updated} known jobs from {path}"
+              + (f" ({skipped} entries without an analysis skipped)" if skipped else ""))
+        return inserted, updated
+
+    @contextmanager
+    def read_transaction(self):
+        """Run several reads against one consistent view of the database (nestable)"""
+        conn = self._connect()
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            conn.commit()
+
+    @staticmethod
+    def _bump_version(conn):
+        conn.execute("UPDATE store_meta SET value = value + 1 WHERE name = 'version'")
+        conn.execute("UPDATE store_meta SET value = CAST(strftime('%s', 'now') AS INTEGER) WHERE name = 'modified'")
+
+    def version(self):
+        """Increases with every write, from any process"""
+        row = self._connect().execute("SELECT value FROM store_meta WHERE name = 'version'").fetchone()
+        return row[0]
+
+    def revision(self):
+        """(version, time of the last write as a Unix timestamp)"""
+        rows = dict(
+            self._connect().execute("SELECT name, value FROM store_meta WHERE name IN ('version', 'modified')")
+        )
+        return rows["version"], rows["modified"]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def _row_to_job(self, row):
+        job = json.loads(row["data"])
+        job["id"] = row["id"]
+        return job
+
+    def all_jobs(self, ordered=True):
+        """Every job, best score first (ties by most recent analysis) unless ordered=False"""
+        order = " ORDER BY overall_score DESC, analyzed_at DESC, id" if ordered else " ORDER BY id"
+        rows = self._connect().execute("SELECT id, data FROM jobs" + order)
+        return [self._row_to_job(row) for row in rows]
+
+    def query(self, filters=None, sort="score", descending=True, limit=50, cursor=None):
+        """
+        One page of jobs, filtered and sorted in SQL (keyset pagination)
+
+        Args:
+            filters: Any of min_score, max_score, priority (list), company
+                (substring), skill, skill_kind, should_apply (bool),
+                analyzed_after, analyzed_before (ISO dates)
+            sort: A SORT_KEYS key; ties are broken by job ID
+            descending: Sort direction
+            limit: Page size
+            cursor: next_cursor of the previous page
+
+        Returns:
+            (jobs, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError on an unknown sort key, skill kind or a bad cursor
+        """
+
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort!r} (use one of {', '.join(SORT_KEYS)})")
+        filters = filters or {}
+        expression = SORT_KEYS[sort]
+        where, params = [], []
+
+        if filters.get("min_score") is not None:
+            where.append("overall_score >= ?")
+            params.append(filters["min_score"])
+        if filters.get("max_score") is not None:
+            where.append("overall_score <= ?")
+            params.append(filters["max_score"])
+        if filters.get("priority"):
+            where.append(f"priority IN ({', '.join('?' * len(filters['priority']))})")
+            params.extend(filters["priority"])
+        if filters.get("company"):
+            where.append("company LIKE ? ESCAPE '\\'")
+            escaped = re.sub(r"([%_\\])", r"\\\1", filters["company"])
+            params.append(f"%{escaped}%")
+        if filters.get("skill"):
+            kind = filters.get("skill_kind")
+            if kind and kind not in SKILL_KINDS:
+                raise ValueError(f"Unknown skill kind {kind!r} (use matching or missing)")
+            # Uncorrelated, so the skill is looked up once in idx_job_skills_skill_nocase
+            where.append(
+                "id IN (SELECT job_id FROM job_skills WHERE skill = ? COLLATE NOCASE"
+                + (" AND kind = ?)" if kind else ")")
+            )
+            params.extend([filters["skill"], kind] if kind else [filters["skill"]])
+        if filters.get("should_apply") is not None:
+            where.append("should_apply = ?")
+            params.append(int(bool(filters["should_apply"])))
+        if filters.get("analyzed_after"):
+            where.append("analyzed_at >= ?")
+            params.append(filters["analyzed_after"])
+        if filters.get("analyzed_before"):
+            where.append("analyzed_at < ?")
+            params.append(filters["analyzed_before"])
+
+        if cursor:
+            value, last_id = _decode_cursor(cursor)
+            # Same as (expression, id) < (value, last_id), written so SQLite
+            # seeks in the (expression, id) index instead of scanning from the top
+            op = "<" if descending else ">"
+            where.append(f"{expression} {op}= ? AND ({expression} {op} ? OR id {op} ?)")
+            params.extend([value, value, last_id])
+
+        direction = "DESC" if descending else "ASC"
+        rows = self._connect().execute(
+            f"""
+            SELECT id, data, {expression} AS sort_value FROM jobs
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY {expression} {direction}, id {direction}
+            LIMIT ?
+            """,
+            params + [limit + 1],
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]["sort_value"], rows[-1]["id"])
+        return [self._row_to_job(row) for row in rows], next_cursor
+
+    def get(self, job_id):
+        row = self._connect().execute("SELECT id, data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def statistics(self):
+        """Dashboard statistics, read from the maintained aggregates"""
+        with self.read_transaction():
+            totals, histogram, _ = self._stored_aggregates(with_skills=False)
+        jobs, scored = int(totals["jobs"]), int(totals["scored"])
+        return {
+            "total_jobs": jobs,
+            "avg_score": round(totals["score_sum"] / scored, 1) if scored else 0,
+            "high_priority": int(totals["high"]),
+            "medium_priority": int(totals["medium"]),
+            "low_priority": int(totals["low"]),
+            "avg_skills_match": round(totals["skills_match_score_sum"] / jobs / 40 * 100, 1) if jobs else 0,
+            "avg_breakdown": {
+                key: round(totals[f"{column}_sum"] / jobs, 1) if jobs else 0
+                for column, key in BREAKDOWN_FIELDS.items()
+            },
+            "score_histogram": [
+                {"range": f"{bucket}-{bucket + SCORE_BUCKET - 1}", "jobs": histogram[bucket]}
+                for bucket in sorted(histogram)
+            ],
+        }
+
+    def top_skills(self, kind="missing", limit=10):
+        """Most frequent skills of a kind, as (skill, job count) pairs (limit=None: all)"""
+        rows = self._connect().execute(
+            "SELECT skill, jobs FROM skill_counts WHERE kind = ? ORDER BY jobs DESC, skill LIMIT ?",
+            (kind, -1 if limit is None else limit),
+        )
+        return [(row["skill"], row["jobs"]) for row in rows]
@@ -0,0 +1,193 @@
+"""
+Job Text - Normalize raw job descriptions before they go into prompts
+
+Descriptions arrive with HTML remnants, boilerplate (benefits, EEO text,
+"à propos de nous") and sometimes very long bodies. Each description is
+cleaned once (results are memoized), boilerplate sections are dropped,
+requirement sections are moved first, and the text is truncated to a
+token budget so LLM latency and cost per job stay predictable.
+"""
+
+import html
+import os
+import re
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from cv_profile import estimate_tokens
+from near_duplicates import normalize_text
+
+# Token budget for a description inside a prompt
+DESCRIPTION_TOKENS = int(os.getenv("JOB_DESCRIPTION_TOKENS", "700"))
+
+NormalizedDescription = namedtuple(
+    "NormalizedDescription", ["text", "tokens_before", "tokens_after", "dropped_sections", "truncated"]
+)
+
+# Section headings (accent-stripped, lowercase) by kind
+REQUIREMENT_HEADINGS = (
+    "profil", "requirements", "qualifications", "competences", "skills",
+    "must have", "what you ll need", "what we re looking for", "you have",
+    "experience requise", "prerequis", "nice to have",
+)
+RESPONSIBILITY_HEADINGS = (
+    "missions", "responsibilities", "what you ll do", "your role", "le poste",
+    "descriptif du poste", "role", "job description", "taches",
+)
+# Whole headings only (after "nos"/"our"...): "Diversity of projects" is content
+BOILERPLATE_HEADINGS = frozenset((
+    "a propos", "a propos de nous", "a propos de l entreprise", "about", "about us",
+    "about the company", "qui sommes nous", "who we are", "benefits", "avantages",
+    "perks", "perks and benefits", "what we offer", "ce que nous offrons", "nous vous offrons",
+    "ce que nous proposons", "pourquoi nous rejoindre", "why join us", "why join", "how to apply",
+    "postuler", "comment postuler", "processus de recrutement", "recruitment process",
+    "equal opportunity", "equal opportunities", "equal opportunity employer",
+    "diversity", "diversity and inclusion", "diversity equity and inclusion",
+    "diversite", "diversite et inclusion", "egalite des chances",
+))
+# Below this share of the cleaned text kept, normalization is assumed to have
+# misread the layout and the cleaned text is used as is
+MIN_KEPT_RATIO = 0.25
+
+# Paragraphs that are boilerplate even without a heading
+BOILERPLATE_PHRASES = (
+    "equal opportunity employer", "without regard to race", "egalite des chances",
+    "situation de handicap", "rqth", "tous nos postes sont ouverts",
+)
+
+_BLOCK_TAGS = re.compile(r"<\s*(br|/p|p|/div|div|/h[1-6]|h[1-6]|/ul|ul|/ol|ol|tr)\b[^>]*>", re.I)
+_LIST_ITEM = re.compile(r"<\s*li\b[^>]*>", re.I)
+_TAGS = re.compile(r"<[^>]+>")
+_HEADING_LINE = re.compile(r"^(#+\s*)?[^.!?]{3,60}:?$")
+
+_stats_lock = threading.Lock()
+_stats = {"descriptions": 0, "tokens_before": 0, "tokens_after": 0, "truncated": 0, "sections_dropped": 0}
+
+
+def _strip_markup(text):
+    text = _LIST_ITEM.sub("\n- ", text)
+    text = _BLOCK_TAGS.sub("\n", text)
+    text = _TAGS.sub(" ", text)
+    text = html.unescape(text)
+    lines = [re.sub(r"\s+", " ", line).strip() for line in text.splitlines()]
+    return "\n".join(lines)
+
+
+def _heading_kind(line):
+    if not _HEADING_LINE.match(line) or line.startswith("- "):
+        return None
+    key = normalize_text(line)
+    bare = re.sub(r"^(nos|vos|notre|votre|our|your|les|le|la|l) ", "", key)
+    if bare in BOILERPLATE_HEADINGS:
+        return "boilerplate"
+    for kind, headings in (
+        ("requirements", REQUIREMENT_HEADINGS),
+        ("responsibilities", RESPONSIBILITY_HEADINGS),
+    ):
+        if any(f" {h}" in f" {key}" for h in headings):
+            return kind
+    return None
+
+
+def _sections(text):
+    """
+    Split into (kind, lines) sections at recognizable headings
+
+    A boilerplate section only runs to the end of its first paragraph after
+    the heading; what follows the next blank line is content again.
+    """
+
+    sections = [["other", []]]
+    for line in text.splitlines():
+        kind = _heading_kind(line) if line else None
+        current_kind, lines = sections[-1]
+        if kind:
+            sections.append([kind, [line]])
+        elif line and current_kind == "boilerplate" and not lines[-1] and any(lines[1:]):
+            sections.append(["other", [line]])
+        elif line or (lines and lines[-1]):
+            lines.append(line)
+    return [(kind, "\n".join(lines).strip()) for kind, lines in sections if "".join(lines).strip()]
+
+
+def _is_boilerplate_paragraph(paragraph):
+    lowered = normalize_text(paragraph)
+    return any(phrase in lowered for phrase in BOILERPLATE_PHRASES)
+
+
+def _truncate(text, max_tokens):
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+    kept = []
+    for line in text.splitlines():
+        if estimate_tokens("\n".join(kept + [line])) > max_tokens:
+            remaining = max_tokens * 4 - len("\n".join(kept)) - 1
+            if remaining > 80:
+                kept.append(line[:remaining].rsplit(" ", 1)[0] + " …")
+            break
+        kept.append(line)
+    return "\n".join(kept).strip(), True
+
+
+@lru_cache(maxsize=4096)
+def _normalize_cached(text, max_tokens):
+    tokens_before = estimate_tokens(text)
+    cleaned = _strip_markup(text)
+
+    order = {"requirements": 0, "responsibilities": 1, "other": 2}
+    kept, dropped = [], 0
+    for kind, body in _sections(cleaned):
+        if kind == "boilerplate":
+            dropped += 1
+            continue
+        paragraphs = [p for p in body.split("\n\n") if not _is_boilerplate_paragraph(p)]
+        dropped += body.count("\n\n") + 1 - len(paragraphs)
+        if paragraphs:
+            kept.append((order[kind], "\n\n".join(paragraphs)))
+
+    # Stable sort: requirement sections first, original order otherwise
+    kept.sort(key=lambda item: item[0])
+    result = re.sub(r"\n{3,}", "\n\n", "\n\n".join(body for _, body in kept)).strip()
+    if len(result) < MIN_KEPT_RATIO * len(cleaned.strip()):
+        result, dropped = re.sub(r"\n{3,}", "\n\n", cleaned).strip(), 0
+    result, truncated = _truncate(result, max_tokens)
+
+    normalized = NormalizedDescription(result, tokens_before, estimate_tokens(result), dropped, truncated)
+    with _stats_lock:
+        _stats["descriptions"] += 1
+        _stats["tokens_before"] += tokens_before
+        _stats["tokens_after"] += normalized.tokens_after
+        _stats["truncated"] += int(truncated)
+        _stats["sections_dropped"] += dropped
+    return normalized
+
+
+def normalize_description(text, max_tokens=DESCRIPTION_TOKENS):
+    """
+    Clean a job description for prompting
+
+    Args:
+        text: Raw description (may contain HTML)
+        max_tokens: Token budget for the result
+
+    Returns:
+        NormalizedDescription(text, tokens_before, tokens_after, dropped_sections, truncated)
+    """
+
+    return _normalize_cached(text or "", max_tokens)
+
+
+def prompt_description(text, max_tokens=DESCRIPTION_TOKENS):
+    """Just the normalized text, for prompt templates"""
+    return normalize_description(text, max_tokens).text
+
+
+def stats():
+    """Token estimates before/after normalization, over unique descriptions"""
+    with _stats_lock:
+        result = dict(_stats)
+    before = result["tokens_before"]
+    result["tokens_saved"] = before - result["tokens_after"]
+    result["reduction"] = round(1 - result["tokens_after"] / before, 3) if before else 0
+    return result
@@ -0,0 +1,402 @@
+"""
+LLM Gateway - One entry point for every LLM call in the app
+
+Fit analysis (main.py) and cover letters (cover_letter_generator.py) both
+call complete(); the backend is chosen with LLM_BACKEND:
+- "groq" (default): the Groq API, model LLM_MODEL
+- "fake": a deterministic local backend that returns schema-valid fit JSON,
+  packed JSON arrays and cover letters without a key or network, with
+  configurable latency and error injection, for offline tests and benchmarks
+
+Calls go through the shared rate limiter whatever the backend, so benchmarks
+with the fake backend exercise the same queueing and concurrency control.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+
+from cv_profile import estimate_tokens
+from metrics import REGISTRY, TOKEN_BUCKETS
+from rate_limiter import LIMITER, RateLimitTimeout, is_rate_limit_error
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+
+# Fake backend knobs: mean latency (s), +/- jitter (s), error and 429 rates (0-1)
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+FAKE_LLM_JITTER = float(os.getenv("FAKE_LLM_JITTER", "0.1"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_RATE_LIMIT_RATE = float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0"))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+# Completion tokens reserved when the caller doesn't say (rate limiter budget)
+DEFAULT_OUTPUT_TOKENS = 500
+
+# USD per million (input, output) tokens, for the cost metric
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+LLMResponse = namedtuple(
+    "LLMResponse", ["text", "model", "total_tokens", "input_tokens", "output_tokens"], defaults=[None, None]
+)
+
+LLM_REQUESTS = REGISTRY.counter("llm_requests_total", "LLM calls by task, model and outcome")
+LLM_RETRIES = REGISTRY.counter("llm_retries_total", "LLM calls retried after a 429")
+LLM_COST = REGISTRY.counter("llm_cost_usd_total", "Estimated LLM spend in USD")
+LLM_QUEUE_WAIT = REGISTRY.histogram("llm_queue_wait_seconds", "Time spent waiting for the rate limiter")
+LLM_LATENCY = REGISTRY.histogram("llm_latency_seconds", "Total LLM call time, queueing included")
+LLM_TTFT = REGISTRY.histogram("llm_time_to_first_token_seconds", "Time to the first streamed chunk")
+LLM_INPUT_TOKENS = REGISTRY.histogram("llm_input_tokens", "Prompt tokens per LLM call", TOKEN_BUCKETS)
+LLM_OUTPUT_TOKENS = REGISTRY.histogram("llm_output_tokens", "Completion tokens per LLM call", TOKEN_BUCKETS)
+
+
+class GroqBackend:
+    """The Groq chat completions API (needs GROQ_API_KEY)"""
+
+    name = "groq"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        # Lazy initialization - avoids crash if GROQ_API_KEY not set at import time
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from groq import Groq
+
+                    # max_retries=0: 429s are retried by the shared rate limiter
+                    self._client = Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+        return self._client
+
+    def complete(self, prompt, model, temperature, max_tokens, task):
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        response = self._get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            **options,
+        )
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            response.choices[0].message.content,
+            model,
+            getattr(usage, "total_tokens", None),
+            getattr(usage, "prompt_tokens", None),
+            getattr(usage, "completion_tokens", None),
+        )
+
+    def stream(self, prompt, model, temperature, max_tokens, task):
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        chunks = self._get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True,
+            **options,
+        )
+        for chunk in chunks:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                yield text
+
+
+class FakeLLMError(Exception):
+    """Injected backend failure"""
+
+    status_code = 500
+
+
+class FakeRateLimitError(Exception):
+    """Injected 429, handled by the rate limiter like a real one"""
+
+    status_code = 429
+
+
+FAKE_SKILLS = [
+    "Python", "SQL", "Machine Learning", "Deep Learning", "NLP", "Pandas",
+    "Scikit-learn", "TensorFlow", "PyTorch", "Spark", "AWS", "Azure", "GCP",
+    "Docker", "Kubernetes", "Airflow", "Tableau", "Power BI", "Statistics",
+    "Git", "MLOps", "LLM", "Computer Vision", "Data Visualization",
+]
+_JOB_ID = re.compile(r"--- JOB_ID: (\S+) ---")
+
+
+class FakeBackend:
+    """
+    Deterministic stand-in for the LLM
+
+    The answer depends only on the prompt (a hash picks the score), so the
+    same job always gets the same analysis. Latency and injected errors come
+    from a seeded RNG, so a benchmark run is reproducible.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency=None, jitter=None, error_rate=None, rate_limit_rate=None, seed=None):
+        self.latency = FAKE_LLM_LATENCY if latency is None else latency
+        self.jitter = FAKE_LLM_JITTER if jitter is None else jitter
+        self.error_rate = FAKE_LLM_ERROR_RATE if error_rate is None else error_rate
+        self.rate_limit_rate = FAKE_LLM_RATE_LIMIT_RATE if rate_limit_rate is None else rate_limit_rate
+        self._rng = random.Random(FAKE_LLM_SEED if seed is None else seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            roll = self._rng.random()
+        return delay, roll
+
+    def _check_errors(self, roll):
+        if roll < self.rate_limit_rate:
+            raise FakeRateLimitError("Fake backend: rate limit reached")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise FakeLLMError("Fake backend: injected error")
+
+    def _answer(self, prompt, model, task):
+        if task == "fit":
+            cv = _between(prompt, "CANDIDATE CV:", "JOB POSTING:")
+            job = _between(prompt, "JOB POSTING:", "Analyze the fit")
+            return json_text(fake_fit_analysis(job, cv, model))
+        if task == "packed_fit":
+            cv = _between(prompt, "CANDIDATE CV:", "Analyze the fit")
+            return json_text([
+                dict(job_id=job_id, **fake_fit_analysis(_between(job, "", "Return ONLY"), cv, model))
+                for job_id, job in _packed_sections(prompt)
+            ])
+        if task == "cover_letter":
+            return fake_cover_letter(prompt)
+        return f"Fake answer ({model}) to a {estimate_tokens(prompt)}-token prompt."
+
+    def complete(self, prompt, model, temperature, max_tokens, task):
+        delay, roll = self._draw()
+        time.sleep(delay)
+        self._check_errors(roll)
+        text = self._answer(prompt, model, task)
+        input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        return LLMResponse(text, model, input_tokens + output_tokens, input_tokens, output_tokens)
+
+    def stream(self, prompt, model, temperature, max_tokens, task):
+        # First chunk after 10% of the latency, the rest spread over the remainder
+        delay, roll = self._draw()
+        time.sleep(delay * 0.1)
+        self._check_errors(roll)
+        words = re.findall(r"\S+\s*|\s+", self._answer(prompt, model, task))
+        chunks = ["".join(words[i:i + 3]) for i in range(0, len(words), 3)]
+        for chunk in chunks:
+            yield chunk
+            time.sleep(delay * 0.9 / len(chunks))
+
+
+def json_text(value):
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def _digest(text):
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _between(text, start, end):
+    begin = text.find(start) + len(start) if start in text else 0
+    stop = text.find(end, begin)
+    return text[begin:stop if stop != -1 else len(text)]
+
+
+def _packed_sections(prompt):
+    """(job_id, job text) for each job of a packed prompt"""
+    parts = _JOB_ID.split(prompt)
+    return list(zip(parts[1::2], parts[2::2]))
+
+
+def _mentions(text):
+    lowered = text.lower()
+    return [skill for skill in FAKE_SKILLS if skill.lower() in lowered]
+
+
+def fake_fit_analysis(job, cv, model=LLM_MODEL):
+    """
+    A schema-valid fit analysis for a job posting
+
+    The score only depends on the job text, so single and packed prompts
+    agree; skills come from FAKE_SKILLS found in the job and the CV.
+    """
+
+    digest = _digest(" ".join(job.split()))
+    breakdown = {
+        "skills_match": digest % 41,
+        "experience_level": (digest >> 8) % 31,
+        "domain_industry": (digest >> 16) % 21,
+        "other_factors": (digest >> 24) % 11,
+    }
+    score = sum(breakdown.values())
+
+    cv_skills = set(_mentions(cv))
+    job_skills = _mentions(job)
+    matching = [skill for skill in job_skills if skill in cv_skills]
+    missing = [skill for skill in job_skills if skill not in cv_skills]
+
+    priority = "High" if score >= 75 else "Medium" if score >= 60 else "Low"
+    return {
+        "overall_score": score,
+        "breakdown": breakdown,
+        "matching_skills": matching,
+        "missing_skills": missing,
+        "recommendation": f"Deterministic {model} verdict: {priority.lower()} fit ({score}/100).",
+        "priority": priority,
+        "should_apply": score >= 65,
+    }
+
+
+def fake_cover_letter(prompt):
+    """A short cover letter in the prompt's language"""
+    french = "EN FRANÇAIS" in prompt
+    title = re.search(r"(?:Poste|Position): (.+)", prompt)
+    company = re.search(r"(?:Entreprise|Company): (.+)", prompt)
+    title = title.group(1).strip() if title else ("ce poste" if french else "this role")
+    company = company.group(1).strip() if company else ("votre entreprise" if french else "your company")
+    if french:
+        return (
+            "Madame, Monsieur,\n\n"
+            f"Je vous adresse ma candidature pour le poste de {title} chez {company}. "
+            "Mon parcours en data et en machine learning correspond aux besoins décrits dans votre offre.\n\n"
+            "Je serais ravi d'échanger avec vous lors d'un entretien.\n\n"
+            "Cordialement"
+        )
+    return (
+        "Dear Hiring Manager,\n\n"
+        f"I am applying for the {title} position at {company}. "
+        "My background in data and machine learning matches the needs described in your posting.\n\n"
+        "I would welcome the opportunity to discuss it in an interview.\n\n"
+        "Sincerely"
+    )
+
+
+BACKENDS = {"groq": GroqBackend, "fake": FakeBackend}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if LLM_BACKEND not in BACKENDS:
+                    raise ValueError(f"Unknown LLM_BACKEND '{LLM_BACKEND}' (expected one of {', '.join(BACKENDS)})")
+                _backend = BACKENDS[LLM_BACKEND]()
+                print(f"LLM backend: {LLM_BACKEND} ({LLM_MODEL})")
+    return _backend
+
+
+def _outcome(error):
+    if error is None:
+        return "ok"
+    if isinstance(error, RateLimitTimeout):
+        return "queue_timeout"
+    return "rate_limited" if is_rate_limit_error(error) else "error"
+
+
+def _observe(task, model, started, trace, error=None, input_tokens=None, output_tokens=None, ttft=None):
+    labels = {"task": task, "model": model}
+    LLM_REQUESTS.inc(outcome=_outcome(error), **labels)
+    LLM_LATENCY.observe(time.monotonic() - started, **labels)
+    if "queue_seconds" in trace:
+        LLM_QUEUE_WAIT.observe(trace["queue_seconds"], **labels)
+    if trace.get("retries"):
+        LLM_RETRIES.inc(trace["retries"], **labels)
+    if ttft is not None:
+        LLM_TTFT.observe(ttft, **labels)
+    if input_tokens is not None:
+        LLM_INPUT_TOKENS.observe(input_tokens, **labels)
+    if output_tokens is not None:
+        LLM_OUTPUT_TOKENS.observe(output_tokens, **labels)
+    if input_tokens is not None and model in MODEL_PRICES:
+        input_price, output_price = MODEL_PRICES[model]
+        LLM_COST.inc((input_tokens * input_price + (output_tokens or 0) * output_price) / 1e6, **labels)
+
+
+def complete(prompt, task="text", model=None, temperature=0, max_tokens=None, output_tokens=None):
+    """
+    Run one completion through the configured backend and the rate limiter
+
+    Args:
+        prompt: Full prompt text
+        task: "fit", "packed_fit", "cover_letter" or "text" (the fake
+            backend uses it to shape its answer; also the metrics label)
+        model: Model name (defaults to LLM_MODEL)
+        temperature: Sampling temperature
+        max_tokens: Completion cap sent to the backend (None = backend default)
+        output_tokens: Expected completion size, for rate limiting only
+            (defaults to max_tokens or DEFAULT_OUTPUT_TOKENS)
+
+    Returns:
+        LLMResponse(text, model, total_tokens, input_tokens, output_tokens)
+    """
+
+    backend = get_backend()
+    model = model or LLM_MODEL
+    expected = output_tokens or max_tokens or DEFAULT_OUTPUT_TOKENS
+    trace = {}
+    started = time.monotonic()
+    try:
+        response = LIMITER.call(
+            lambda: backend.complete(prompt, model, temperature, max_tokens, task),
+            tokens=estimate_tokens(prompt) + expected,
+            trace=trace,
+        )
+    except Exception as e:
+        _observe(task, model, started, trace, error=e)
+        raise
+    _observe(
+        task, model, started, trace,
+        input_tokens=response.input_tokens or estimate_tokens(prompt),
+        output_tokens=response.output_tokens or estimate_tokens(response.text or ""),
+    )
+    return response
+
+
+def stream(prompt, task="text", model=None, temperature=0, max_tokens=None, output_tokens=None):
+    """
+    Like complete(), but yields the completion text in chunks as it is generated
+
+    Arguments are the same as complete(). Token counts for streams are estimates.
+    """
+
+    backend = get_backend()
+    model = model or LLM_MODEL
+    expected = output_tokens or max_tokens or DEFAULT_OUTPUT_TOKENS
+    trace = {}
+    started = time.monotonic()
+    ttft = None
+    chunks = []
+    error = None
+    try:
+        for chunk in LIMITER.stream(
+            lambda: backend.stream(prompt, model, temperature, max_tokens, task),
+            tokens=estimate_tokens(prompt) + expected,
+            trace=trace,
+        ):
+            if ttft is None:
+                ttft = time.monotonic() - started
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        # Also recorded when the client disconnects mid-stream
+        _observe(
+            task, model, started, trace, error=error, ttft=ttft,
+            input_tokens=estimate_tokens(prompt),
+            output_tokens=estimate_tokens("".join(chunks)) if chunks else 0,
+        )
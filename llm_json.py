@@ -0,0 +1,204 @@
+"""
+LLM JSON - Tolerant extraction and repair of JSON in LLM answers
+
+Models wrap JSON in code fences or prose, leave trailing commas, write
+Python literals (True/None), or get cut off mid-object. Instead of failing
+(and paying for a whole new analysis), loads() finds the first JSON value in
+the answer, parses it directly when it is clean, and otherwise repairs it in
+one pass:
+- strips ``` fences, // comments and text around the value
+- drops trailing commas, fixes mismatched closers and smart quotes
+- maps True/False/None, quotes bare keys, escapes raw newlines in strings
+- closes a truncated value (dangling keys are dropped, open strings,
+  arrays and objects are closed)
+
+Outcomes are counted so parse-failure and repair rates show up in /cache/stats.
+"""
+
+import json
+import re
+import threading
+
+
+class InvalidLLMOutput(ValueError):
+    """The LLM answer could not be parsed or validated, even after repair"""
+
+
+_FENCE = re.compile(r"```[a-zA-Z]*")
+_LITERALS = {"True": "true", "False": "false", "None": "null", "true": "true", "false": "false", "null": "null"}
+_SMART_QUOTES = "“”„«»"
+# A key with no value yet at the end of a truncated object: {"a": 1, "b":
+_DANGLING_KEY = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+# How many opening brackets to try when prose before the JSON contains braces
+MAX_CANDIDATES = 5
+
+_stats_lock = threading.Lock()
+_stats = {"parsed": 0, "repaired": 0, "failed": 0, "invalid": 0, "reasks": 0, "reask_recovered": 0}
+
+
+def record(outcome):
+    """Count a parse outcome (callers add "invalid", "reasks", "reask_recovered")"""
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def stats():
+    with _stats_lock:
+        result = dict(_stats)
+    total = result["parsed"] + result["repaired"] + result["failed"]
+    result["repair_rate"] = round(result["repaired"] / total, 3) if total else 0
+    result["failure_rate"] = round((result["failed"] + result["invalid"]) / total, 3) if total else 0
+    return result
+
+
+def _close_truncated(out, stack, in_string):
+    text = "".join(out)
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    if stack and stack[-1] == "}":
+        text = _DANGLING_KEY.sub(r"\1", text)
+    text = text.rstrip().rstrip(",").rstrip()
+    return text + "".join(reversed(stack))
+
+
+def repair(text, start=0):
+    """
+    Rewrite the JSON value starting at text[start] into valid JSON text
+
+    Returns:
+        The repaired value text (not guaranteed to parse if the answer is
+        too broken, e.g. single-quoted strings)
+    """
+
+    out, stack = [], []
+    in_string = escape = False
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"' or ch in _SMART_QUOTES:
+                ch, in_string = '"', False
+            elif ch == "\n":
+                ch = "\\n"
+            out.append(ch)
+            i += 1
+            continue
+
+        if ch == '"' or ch in _SMART_QUOTES:
+            out.append('"')
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            out.append(stack.pop())
+            if not stack:
+                return "".join(out)
+        elif ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif ch.isalpha() or ch == "_":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            if word in _LITERALS:
+                out.append(_LITERALS[word])
+            elif text[j:].lstrip().startswith(":"):
+                out.append(f'"{word}"')
+            elif j < n:
+                out.append(word)
+            # else: a literal cut off at the end of the answer is dropped
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    return _close_truncated(out, stack, in_string)
+
+
+def _starts_value(text, start):
+    """
+    Whether the bracket at text[start] opens a JSON-like value, not prose
+
+    An object must go on with a key (quoted or bare) or close; an array with
+    a value. "{the answer}" or "[see below]" in the prose around the JSON
+    don't, so they are skipped.
+    """
+
+    i = start + 1
+    while i < len(text) and text[i].isspace():
+        i += 1
+    if i == len(text):
+        return True  # cut off right after the bracket
+    ch = text[i]
+    if ch in "\"'}]" or ch in _SMART_QUOTES:
+        return True
+    word = re.match(r"[A-Za-z_]\w*", text[i:])
+    if text[start] == "{":
+        return bool(word) and text[i + word.end():].lstrip().startswith(":")
+    return ch in "{[-" or ch.isdigit() or bool(word and word.group() in _LITERALS)
+
+
+def loads(text, expect=dict):
+    """
+    Parse the first JSON object (or array, with expect=list) in an LLM answer
+
+    The first bracket that opens a JSON-like value is the answer: it is
+    parsed directly, else repaired. Brackets nested inside it are never
+    tried on their own, so a damaged answer can't come back as one of its
+    inner objects (e.g. just the breakdown).
+
+    Raises:
+        json.JSONDecodeError if no value of the expected type can be recovered
+    """
+
+    cleaned = _FENCE.sub("", text or "")
+    opener = "{" if expect is dict else "["
+
+    starts = []
+    position = cleaned.find(opener)
+    while position != -1 and len(starts) < MAX_CANDIDATES:
+        starts.append(position)
+        position = cleaned.find(opener, position + 1)
+
+    decoder = json.JSONDecoder()
+    error = None
+    for start in starts:
+        if not _starts_value(cleaned, start):
+            continue
+
+        # Clean answers (the usual case) parse without any rewriting
+        try:
+            value = decoder.raw_decode(cleaned, start)[0]
+            if isinstance(value, expect):
+                record("parsed")
+                return value
+        except json.JSONDecodeError:
+            pass
+
+        try:
+            value = json.loads(repair(cleaned, start))
+            if isinstance(value, expect):
+                record("repaired")
+                return value
+        except json.JSONDecodeError as e:
+            error = e
+        # Later brackets would be inside this (unrecoverable) value
+        break
+
+    record("failed")
+    raise error or json.JSONDecodeError(f"No JSON {expect.__name__} in answer", cleaned, 0)
@@ -3,55 +3,129 @@ Combined Flask app for Railway deployment.
 Merges API (app.py) + Dashboard (dashboard.py) into a single server.
 """
 
-from flask import Flask, request, jsonify, render_template
-from langchain_groq import ChatGroq
+from flask import Flask, Response, g, request, jsonify, render_template, stream_with_context
 from langchain_core.prompts import ChatPromptTemplate
 import os
 from dotenv import load_dotenv
 import json
 import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from collections import Counter
 
-from cover_letter_generator import generate_cover_letter, save_cover_letter
+from cover_letter_generator import generate_cover_letter, save_cover_letter, stream_cover_letter
+from cv_profile import estimate_tokens, get_profile
+import job_text
+from job_text import prompt_description
+from disk_cache import DiskCache, make_key
+import llm_gateway
+import llm_json
+from http_cache import ResponseCache
+from job_snapshot import JobSnapshots
+from job_store import JobStore, extract_jobs
+from llm_json import InvalidLLMOutput
+from metrics import REGISTRY
+from prefilter import MIN_SCORE as PREFILTER_MIN_SCORE, score_jobs
+from rate_limiter import LIMITER, RateLimitTimeout
+from singleflight import SingleFlight
 
 load_dotenv()
 
 app = Flask(__name__)
 
-CACHE = {}
+LLM_MODEL = llm_gateway.LLM_MODEL
 
-# Lazy initialization - avoids crash if keys not set at import time
-_llm = None
+# Fit analyses are cached on disk (SQLite WAL) so every gunicorn worker shares
+# them and they survive redeploys. Entries are keyed on the CV, the prompt
+# version and the normalized job content, so a CV edit invalidates them.
+ANALYSIS_CACHE_PATH = os.getenv(
+    "ANALYSIS_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), ".cache", "analysis_cache.sqlite3"),
+)
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "5000"))
 
+ANALYSIS_CACHE = DiskCache(
+    ANALYSIS_CACHE_PATH, ttl=ANALYSIS_CACHE_TTL, max_entries=ANALYSIS_CACHE_MAX_ENTRIES
+)
 
-def get_llm():
-    global _llm
-    if _llm is None:
-        _llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            groq_api_key=os.getenv("GROQ_API_KEY"),
-            temperature=0,
-        )
-    return _llm
+# Concurrent identical analyses / cover letters share one in-flight LLM call
+ANALYSIS_FLIGHTS = SingleFlight()
+COVER_LETTER_FLIGHTS = SingleFlight()
+
+# Parallelism for /analyze-fit/batch (requests may ask for less, never more)
+BATCH_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", "4"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_MAX_CONCURRENCY", "16"))
+
+# Completion tokens reserved per job when budgeting LLM calls
+FIT_OUTPUT_TOKENS = 400
+
+# Model cascade ("cascade" mode): a small model scores every job first and
+# only jobs in the borderline band, or at/above the apply threshold, are
+# re-analyzed by LLM_MODEL. FIT_ANALYSIS_MODE sets the default mode.
+CASCADE_SMALL_MODEL = os.getenv("CASCADE_SMALL_MODEL", "llama-3.1-8b-instant")
+CASCADE_BAND_LOW = float(os.getenv("CASCADE_BAND_LOW", "45"))
+CASCADE_BAND_HIGH = float(os.getenv("CASCADE_BAND_HIGH", "64"))
+APPLY_THRESHOLD = float(os.getenv("APPLY_THRESHOLD", "65"))
+FIT_ANALYSIS_MODE = os.getenv("FIT_ANALYSIS_MODE", "single")
+
+_cascade_lock = threading.Lock()
+_cascade_stats = {"decided_by_small": 0, "escalated": 0, "small_invalid": 0}
+
+# Token budget for the compact CV rendering sent with fit analyses
+CV_PROMPT_TOKENS = int(os.getenv("CV_PROMPT_TOKENS", "900"))
 
 
 def get_cv():
-    cv_content = os.getenv("CV_CONTENT")
-    if cv_content:
-        return cv_content
-    cv_path = os.path.join(os.path.dirname(__file__), "my_cv.txt")
-    if os.path.exists(cv_path):
-        with open(cv_path, "r", encoding="utf-8") as f:
-            return f.read()
-    return "CV not configured. Set CV_CONTENT environment variable."
-
-# Job results file path
+    profile = get_profile()
+    if profile is None:
+        return "CV not configured. Set CV_CONTENT environment variable."
+    return profile.render(CV_PROMPT_TOKENS)
+
+
+def get_cv_hash():
+    # Stable across requests; changes with the CV text or the prompt budget
+    profile = get_profile()
+    return f"{profile.hash}:{CV_PROMPT_TOKENS}" if profile else "no-cv"
+
+# Analyzed jobs live in a SQLite store; the legacy job_results.json is
+# imported into it once, when the store is empty
 RESULTS_FILE = os.path.join(os.path.dirname(__file__), "job_results.json")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(os.path.dirname(__file__), "jobs.sqlite3"))
+
+JOB_STORE = JobStore(JOB_STORE_PATH)
+if JOB_STORE.count() == 0 and os.path.exists(RESULTS_FILE):
+    try:
+        JOB_STORE.import_file(RESULTS_FILE)
+    except Exception as e:
+        print(f"Could not import {RESULTS_FILE}: {e}")
+
+JOB_STORE_EMPTY_STATS = {
+    "total_jobs": 0,
+    "avg_score": 0,
+    "high_priority": 0,
+    "medium_priority": 0,
+    "low_priority": 0,
+    "avg_skills_match": 0,
+    "avg_breakdown": {},
+    "score_histogram": [],
+}
+
+# Jobs rendered by the dashboard (the best ones); /api/jobs pages through the rest
+DASHBOARD_MAX_JOBS = int(os.getenv("DASHBOARD_MAX_JOBS", "100"))
+# Those jobs + the statistics, reloaded only when the store version changes
+JOB_SNAPSHOTS = JobSnapshots(JOB_STORE, DASHBOARD_MAX_JOBS)
+API_JOBS_PAGE_SIZE = int(os.getenv("API_JOBS_PAGE_SIZE", "50"))
+API_JOBS_MAX_PAGE_SIZE = int(os.getenv("API_JOBS_MAX_PAGE_SIZE", "200"))
+
+# Dashboard and job API bodies, revalidated (ETag / 304) against the store version
+RESPONSE_CACHE = ResponseCache()
+with open(os.path.join(app.root_path, "templates", "dashboard.html"), "rb") as f:
+    DASHBOARD_TEMPLATE_VERSION = hashlib.sha256(f.read()).hexdigest()[:12]
 
 # Fit analysis prompt template
-FIT_ANALYSIS_PROMPT = ChatPromptTemplate.from_template(
-    """
+FIT_ANALYSIS_TEMPLATE = """
 You are an expert career advisor analyzing job fit.
 
 CANDIDATE CV:
@@ -102,7 +176,66 @@ Return ONLY valid JSON in this exact format:
   "should_apply": true
 }}
 """
-)
+FIT_ANALYSIS_PROMPT = ChatPromptTemplate.from_template(FIT_ANALYSIS_TEMPLATE)
+
+# Packed variant: the CV is sent once for several jobs, answered as a JSON array
+PACKED_FIT_ANALYSIS_TEMPLATE = """
+You are an expert career advisor analyzing job fit.
+
+CANDIDATE CV:
+{cv}
+
+Analyze the fit between this candidate and EACH of the job postings below,
+independently of each other. For each job, score it exactly like this:
+
+1. **Overall Fit Score** (0-100): 90-100 excellent, 75-89 very good,
+   65-74 good, 50-64 moderate, below 50 poor fit
+2. **Breakdown**: skills_match (0-40), experience_level (0-30),
+   domain_industry (0-20), other_factors (0-10)
+3. **Matching Skills** and **Missing Skills**
+4. **Recommendation**, **Priority** (High/Medium/Low) and **should_apply**
+
+JOB POSTINGS:
+{jobs}
+
+Return ONLY a valid JSON array with exactly one object per job, in this format:
+[
+  {{
+    "job_id": "job-0",
+    "overall_score": 85,
+    "breakdown": {{
+      "skills_match": 35,
+      "experience_level": 25,
+      "domain_industry": 18,
+      "other_factors": 7
+    }},
+    "matching_skills": ["Python", "Machine Learning", "SQL"],
+    "missing_skills": ["AWS", "Kubernetes"],
+    "recommendation": "Strong candidate. Your ML and Python experience align well...",
+    "priority": "High",
+    "should_apply": true
+  }}
+]
+"""
+PACKED_FIT_ANALYSIS_PROMPT = ChatPromptTemplate.from_template(PACKED_FIT_ANALYSIS_TEMPLATE)
+
+PACKED_JOB_TEMPLATE = """--- JOB_ID: {job_id} ---
+Title: {job_title}
+Company: {company}
+Location: {location}
+Description: {job_description}
+"""
+
+# Packing limits: total prompt tokens (estimated) and jobs per prompt
+PACKED_TOKEN_BUDGET = int(os.getenv("PACKED_TOKEN_BUDGET", "6000"))
+PACKED_MAX_JOBS = int(os.getenv("PACKED_MAX_JOBS", "8"))
+
+# Changes whenever the prompt text, model or description budget changes,
+# retiring cached analyses
+PROMPT_VERSION = hashlib.sha256(
+    f"{llm_gateway.LLM_BACKEND}:{LLM_MODEL}\n{FIT_ANALYSIS_TEMPLATE}\n{PACKED_FIT_ANALYSIS_TEMPLATE}\n"
+    f"{job_text.DESCRIPTION_TOKENS}".encode()
+).hexdigest()[:12]
 
 
 # ============================================================
@@ -115,53 +248,366 @@ def health():
     return jsonify({"status": "healthy", "message": "Job Agent API is running"})
 
 
-@app.route("/analyze-fit", methods=["POST"])
-def analyze_fit():
+REQUIRED_JOB_FIELDS = ["job_title", "company", "job_description"]
+
+
+def missing_job_field(data):
+    if not isinstance(data, dict):
+        return "job"
+    for field in REQUIRED_JOB_FIELDS:
+        if field not in data:
+            return field
+    return None
+
+
+def _normalize(value):
+    return " ".join(str(value or "").split())
+
+
+def analysis_cache_key(data, model=None):
+    job_content = [
+        _normalize(data.get(field))
+        for field in ("job_title", "company", "location", "job_description")
+    ]
+    if model and model != LLM_MODEL:
+        # Other models (cascade small tier) get their own entries
+        return make_key("fit", PROMPT_VERSION, model, get_cv_hash(), *job_content)
+    return make_key("fit", PROMPT_VERSION, get_cv_hash(), *job_content)
+
+
+def _with_job_data(analysis, data):
+    # job_data is per-request (reposts share an analysis but not a URL)
+    analysis = dict(analysis)
+    analysis["job_data"] = {
+        "title": data["job_title"],
+        "company": data["company"],
+        "location": data.get("location"),
+        "url": data.get("job_url"),
+    }
+    return analysis
+
+
+def _fit_prompt(data, cv):
+    return FIT_ANALYSIS_PROMPT.format(
+        cv=cv,
+        job_title=data["job_title"],
+        company=data["company"],
+        location=data.get("location", "Not specified"),
+        job_description=prompt_description(data["job_description"]),
+    )
+
+
+def _analyze_uncached(data, cv, cache_key, model=LLM_MODEL):
+    # Runs as the single-flight leader: an identical flight may have finished
+    # (and filled the cache) between the caller's cache miss and here
+    cached = ANALYSIS_CACHE.get(cache_key, count=False)
+    if cached is not None:
+        print(f"Using cached analysis for {data['job_title']} (finished while waiting)")
+        return cached
+
+    prompt_text = _fit_prompt(data, cv)
+
+    print(f"Analyzing: {data['job_title']} at {data['company']} ({model})")
+    response_text = llm_gateway.complete(
+        prompt_text, task="fit", model=model, output_tokens=FIT_OUTPUT_TOKENS
+    ).text
+
+    analysis = parse_fit_analysis(response_text, model)
+    analysis["decided_by"] = "large" if model == LLM_MODEL else "small"
+
+    print(f"Score: {analysis['overall_score']}/100")
+    ANALYSIS_CACHE.set(cache_key, analysis)
+    return analysis
+
+
+def run_fit_analysis(data, model=LLM_MODEL):
+    """Analyze one job against the CV (cached). Raises on LLM or JSON errors."""
+    cv = get_cv()
+    cache_key = analysis_cache_key(data, model)
+
+    cached = ANALYSIS_CACHE.get(cache_key)
+    if cached is not None:
+        print(f"Using cached analysis for {data['job_title']}")
+        return _with_job_data(cached, data)
+
+    # A cache miss joins any identical analysis already in flight
+    analysis = ANALYSIS_FLIGHTS.do(cache_key, lambda: _analyze_uncached(data, cv, cache_key, model))
+    return _with_job_data(analysis, data)
+
+
+def needs_escalation(score):
+    """Whether a small-model score is borderline or high enough to apply"""
+    return CASCADE_BAND_LOW <= score <= CASCADE_BAND_HIGH or score >= APPLY_THRESHOLD
+
+
+def run_cascade_analysis(data):
+    """
+    Analyze one job with the small model first, escalating only if needed.
+
+    Clear non-fits keep the small model's analysis (decided_by "small").
+    Borderline and likely-apply jobs, or unusable small-model answers, get
+    the full LLM_MODEL analysis (decided_by "large", with the small model's
+    preliminary_score when there was one).
+    """
+    large = ANALYSIS_CACHE.get(analysis_cache_key(data))
+    if large is not None:
+        print(f"Using cached analysis for {data['job_title']}")
+        return _with_job_data(large, data)
+
+    preliminary = None
     try:
-        data = request.json
+        small = run_fit_analysis(data, CASCADE_SMALL_MODEL)
+        problem = validate_fit_analysis(small)
+    except InvalidLLMOutput as e:
+        problem = str(e)
+    if problem:
+        print(f"Small model answer unusable ({problem}), escalating")
+        with _cascade_lock:
+            _cascade_stats["small_invalid"] += 1
+    else:
+        preliminary = small["overall_score"]
+        if not needs_escalation(preliminary):
+            with _cascade_lock:
+                _cascade_stats["decided_by_small"] += 1
+            return small
+
+    with _cascade_lock:
+        _cascade_stats["escalated"] += 1
+    analysis = run_fit_analysis(data)
+    if preliminary is not None:
+        analysis["preliminary_score"] = preliminary
+    return analysis
+
+
+def cascade_stats():
+    with _cascade_lock:
+        stats = dict(_cascade_stats)
+    decided = stats["decided_by_small"] + stats["escalated"]
+    stats["escalation_rate"] = round(stats["escalated"] / decided, 3) if decided else 0
+    stats.update(small_model=CASCADE_SMALL_MODEL, band=[CASCADE_BAND_LOW, CASCADE_BAND_HIGH],
+                 apply_threshold=APPLY_THRESHOLD)
+    return stats
+
+
+# Fit result schema: breakdown maxima, allowed drift between the breakdown
+# sum and overall_score, and priority values
+BREAKDOWN_LIMITS = {"skills_match": 40, "experience_level": 30, "domain_industry": 20, "other_factors": 10}
+BREAKDOWN_TOLERANCE = 5
+PRIORITIES = ("High", "Medium", "Low")
+
+# Cheap re-ask when an answer can't be repaired: no CV or job, just the answer
+FIT_REASK_TEMPLATE = """Your previous answer could not be used: {problem}.
+
+PREVIOUS ANSWER:
+{answer}
+
+Return ONLY the corrected JSON object with: overall_score (0-100), breakdown
+(skills_match 0-40, experience_level 0-30, domain_industry 0-20, other_factors 0-10,
+summing to overall_score), matching_skills and missing_skills (lists of strings),
+recommendation (string), priority (High/Medium/Low) and should_apply (true/false).
+"""
+REASK_ANSWER_CHARS = 4000
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _as_number(value):
+    if isinstance(value, str):
+        try:
+            number = float(value.strip().rstrip("%"))
+        except ValueError:
+            return value
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def coerce_fit_analysis(analysis):
+    """Fix harmless type slips ("85", "true", "high", "A, B") in place"""
+    if not isinstance(analysis, dict):
+        return analysis
+    if "overall_score" in analysis:
+        analysis["overall_score"] = _as_number(analysis["overall_score"])
+    breakdown = analysis.get("breakdown")
+    if isinstance(breakdown, dict):
+        for key, value in breakdown.items():
+            breakdown[key] = _as_number(value)
+    for field in ("matching_skills", "missing_skills"):
+        if isinstance(analysis.get(field), str):
+            analysis[field] = [skill.strip() for skill in analysis[field].split(",") if skill.strip()]
+    priority = analysis.get("priority")
+    if isinstance(priority, str) and priority.strip().capitalize() in PRIORITIES:
+        analysis["priority"] = priority.strip().capitalize()
+    should_apply = analysis.get("should_apply")
+    if isinstance(should_apply, str) and should_apply.strip().lower() in ("true", "false", "yes", "no"):
+        analysis["should_apply"] = should_apply.strip().lower() in ("true", "yes")
+    return analysis
+
+
+def validate_fit_analysis(analysis):
+    """Return None if analysis looks like a fit result, else the problem"""
+    if not isinstance(analysis, dict):
+        return "not an object"
+    score = analysis.get("overall_score")
+    if not _is_number(score) or not 0 <= score <= 100:
+        return "overall_score missing or out of range"
+    breakdown = analysis.get("breakdown")
+    if not isinstance(breakdown, dict):
+        return "breakdown missing"
+    for key, limit in BREAKDOWN_LIMITS.items():
+        if not _is_number(breakdown.get(key)) or not 0 <= breakdown[key] <= limit:
+            return f"breakdown.{key} missing or outside 0-{limit}"
+    total = sum(breakdown[key] for key in BREAKDOWN_LIMITS)
+    if abs(total - score) > BREAKDOWN_TOLERANCE:
+        return f"breakdown sums to {total}, overall_score is {score}"
+    for field in ("matching_skills", "missing_skills"):
+        value = analysis.get(field)
+        if not isinstance(value, list) or not all(isinstance(skill, str) for skill in value):
+            return f"{field} is not a list of strings"
+    if not isinstance(analysis.get("recommendation"), str):
+        return "recommendation missing"
+    if analysis.get("priority") not in PRIORITIES:
+        return "priority not High/Medium/Low"
+    if not isinstance(analysis.get("should_apply"), bool):
+        return "should_apply missing"
+    return None
+
+
+def parse_fit_analysis(response_text, model=LLM_MODEL, reask=True):
+    """
+    Parse, repair and validate a fit analysis answer.
 
-        cache_key = hashlib.md5(
-            f"{data['job_title']}{data['company']}".encode()
-        ).hexdigest()
-
-        if cache_key in CACHE:
-            print(f"Using cached analysis for {data['job_title']}")
-            return jsonify(CACHE[cache_key])
-
-        required_fields = ["job_title", "company", "job_description"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-
-        prompt_text = FIT_ANALYSIS_PROMPT.format(
-            cv=get_cv(),
-            job_title=data["job_title"],
-            company=data["company"],
-            location=data.get("location", "Not specified"),
-            job_description=data["job_description"],
+    Only when repair can't produce a valid result is the model re-asked,
+    once, with just its previous answer and the problem (no CV or job).
+    Raises InvalidLLMOutput if that fails too.
+    """
+    try:
+        analysis = coerce_fit_analysis(llm_json.loads(response_text))
+        problem = validate_fit_analysis(analysis)
+        if problem:
+            llm_json.record("invalid")
+    except json.JSONDecodeError as e:
+        problem = f"invalid JSON ({e.msg})"
+
+    if not problem:
+        return analysis
+    if not reask:
+        raise InvalidLLMOutput(problem)
+
+    print(f"Fit analysis unusable ({problem}), re-asking")
+    llm_json.record("reasks")
+    prompt_text = FIT_REASK_TEMPLATE.format(problem=problem, answer=response_text[:REASK_ANSWER_CHARS])
+    retry_text = llm_gateway.complete(prompt_text, task="fit", model=model, output_tokens=FIT_OUTPUT_TOKENS).text
+    analysis = parse_fit_analysis(retry_text, model, reask=False)
+    llm_json.record("reask_recovered")
+    return analysis
+
+
+def _format_packed_job(job_id, data):
+    return PACKED_JOB_TEMPLATE.format(
+        job_id=job_id,
+        job_title=data["job_title"],
+        company=data["company"],
+        location=data.get("location", "Not specified"),
+        job_description=prompt_description(data["job_description"]),
+    )
+
+
+def pack_jobs(items, cv, token_budget=PACKED_TOKEN_BUDGET, max_jobs=PACKED_MAX_JOBS):
+    """Group (index, job) pairs so each group's prompt fits the token budget"""
+    base_tokens = estimate_tokens(PACKED_FIT_ANALYSIS_TEMPLATE) + estimate_tokens(cv)
+    groups, current, used = [], [], base_tokens
+    for index, data in items:
+        job_tokens = estimate_tokens(_format_packed_job(f"job-{index}", data))
+        if current and (used + job_tokens > token_budget or len(current) >= max_jobs):
+            groups.append(current)
+            current, used = [], base_tokens
+        current.append((index, data))
+        used += job_tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def run_packed_fit_analysis(group):
+    """
+    Analyze several jobs with one LLM call (CV sent once).
+
+    Takes a list of (index, job) pairs and returns (index, batch item result)
+    pairs. Cached jobs are answered from the cache, and any job whose element
+    is missing or invalid in the packed answer falls back to a single call.
+    """
+    cv = get_cv()
+    results, pending = [], []
+    for index, data in group:
+        cached = ANALYSIS_CACHE.get(analysis_cache_key(data))
+        if cached is not None:
+            results.append((index, {"index": index, "status": "ok", "analysis": _with_job_data(cached, data)}))
+        else:
+            pending.append((index, data))
+
+    if len(pending) == 1:
+        index, data = pending[0]
+        return results + [(index, _analyze_batch_item(index, data))]
+
+    parsed = {}
+    if pending:
+        prompt_text = PACKED_FIT_ANALYSIS_PROMPT.format(
+            cv=cv,
+            jobs="\n".join(_format_packed_job(f"job-{index}", data) for index, data in pending),
         )
+        print(f"Analyzing {len(pending)} jobs in one packed prompt (~{estimate_tokens(prompt_text)} tokens)")
+        try:
+            response_text = llm_gateway.complete(
+                prompt_text, task="packed_fit", output_tokens=FIT_OUTPUT_TOKENS * len(pending)
+            ).text
+            elements = llm_json.loads(response_text, expect=list)
+            parsed = {str(e.get("job_id")): coerce_fit_analysis(e) for e in elements if isinstance(e, dict)}
+        except json.JSONDecodeError as e:
+            print(f"Packed JSON parsing error, falling back to single calls: {e}")
+        except Exception as e:
+            print(f"Packed analysis error, falling back to single calls: {e}")
+
+    fallbacks = 0
+    for index, data in pending:
+        analysis = parsed.get(f"job-{index}")
+        problem = validate_fit_analysis(analysis)
+        if problem:
+            if analysis is not None:
+                llm_json.record("invalid")
+            fallbacks += 1
+            print(f"Packed result for job {index} invalid ({problem}), analyzing it alone")
+            results.append((index, _analyze_batch_item(index, data)))
+            continue
+        analysis = {key: value for key, value in analysis.items() if key != "job_id"}
+        analysis["decided_by"] = "large"
+        ANALYSIS_CACHE.set(analysis_cache_key(data), analysis)
+        results.append((index, {"index": index, "status": "ok", "analysis": _with_job_data(analysis, data), "packed": True}))
+
+    if pending:
+        print(f"Packed prompt: {len(pending) - fallbacks}/{len(pending)} jobs answered, {fallbacks} fallbacks")
+    return results
 
-        print(f"Analyzing: {data['job_title']} at {data['company']}")
-        response = get_llm().invoke(prompt_text)
-        response_text = response.content
 
-        json_start = response_text.find("{")
-        json_end = response_text.rfind("}") + 1
-        json_str = response_text[json_start:json_end]
-        analysis = json.loads(json_str)
+@app.route("/analyze-fit", methods=["POST"])
+def analyze_fit():
+    try:
+        data = request.json
 
-        analysis["job_data"] = {
-            "title": data["job_title"],
-            "company": data["company"],
-            "location": data.get("location"),
-            "url": data.get("job_url"),
-        }
+        missing = missing_job_field(data)
+        if missing:
+            return jsonify({"error": f"Missing required field: {missing}"}), 400
 
-        print(f"Score: {analysis['overall_score']}/100")
-        CACHE[cache_key] = analysis
-        return jsonify(analysis)
+        mode = request.args.get("mode") or data.get("mode") or FIT_ANALYSIS_MODE
+        if mode == "cascade":
+            return jsonify(run_cascade_analysis(data))
+        return jsonify(run_fit_analysis(data))
 
-    except json.JSONDecodeError as e:
+    except RateLimitTimeout as e:
+        print(f"Rate limited: {e}")
+        return jsonify({"error": "LLM busy, try again later", "details": str(e)}), 503
+    except InvalidLLMOutput as e:
         print(f"JSON parsing error: {e}")
         return jsonify({"error": "Failed to parse AI response", "details": str(e)}), 500
     except Exception as e:
@@ -169,6 +615,295 @@ def analyze_fit():
         return jsonify({"error": str(e)}), 500
 
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        # Don't let proxies buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def stream_fit_analysis(data):
+    """SSE events for one analysis: start, token..., then result (or error)"""
+    yield sse_event("start", {"job_title": data["job_title"], "company": data["company"]})
+    try:
+        cache_key = analysis_cache_key(data)
+        cached = ANALYSIS_CACHE.get(cache_key)
+        if cached is not None:
+            yield sse_event("result", _with_job_data(cached, data))
+            return
+
+        print(f"Streaming analysis: {data['job_title']} at {data['company']}")
+        chunks = []
+        for chunk in llm_gateway.stream(_fit_prompt(data, get_cv()), task="fit", output_tokens=FIT_OUTPUT_TOKENS):
+            chunks.append(chunk)
+            yield sse_event("token", {"text": chunk})
+
+        analysis = parse_fit_analysis("".join(chunks))
+        analysis["decided_by"] = "large"
+        ANALYSIS_CACHE.set(cache_key, analysis)
+        yield sse_event("result", _with_job_data(analysis, data))
+    except InvalidLLMOutput as e:
+        print(f"JSON parsing error: {e}")
+        yield sse_event("error", {"error": "Failed to parse AI response", "details": str(e)})
+    except Exception as e:
+        print(f"Error: {e}")
+        yield sse_event("error", {"error": str(e)})
+
+
+@app.route("/analyze-fit/stream", methods=["POST"])
+def analyze_fit_stream():
+    """Same as /analyze-fit, streamed as Server-Sent Events"""
+    data = request.json
+    missing = missing_job_field(data)
+    if missing:
+        return jsonify({"error": f"Missing required field: {missing}"}), 400
+    return sse_response(stream_fit_analysis(data))
+
+
+def _analyze_batch_item(index, data, cascade=False):
+    missing = missing_job_field(data)
+    if missing:
+        return {"index": index, "status": "error", "error": f"Missing required field: {missing}"}
+    try:
+        analysis = run_cascade_analysis(data) if cascade else run_fit_analysis(data)
+        return {"index": index, "status": "ok", "analysis": analysis}
+    except InvalidLLMOutput as e:
+        print(f"JSON parsing error (job {index}): {e}")
+        return {"index": index, "status": "error", "error": "Failed to parse AI response", "details": str(e)}
+    except Exception as e:
+        print(f"Error (job {index}): {e}")
+        return {"index": index, "status": "error", "error": str(e)}
+
+
+def _request_jobs(data):
+    jobs = data.get("jobs") if isinstance(data, dict) else data
+    return jobs if isinstance(jobs, list) else None
+
+
+def _prefilter_min_score(data):
+    if isinstance(data, dict) and data.get("min_score") is not None:
+        return float(data["min_score"])
+    return PREFILTER_MIN_SCORE
+
+
+@app.route("/prefilter", methods=["POST"])
+def prefilter():
+    """Score jobs locally against the CV and split them into kept / rejected"""
+    data = request.json
+    jobs = _request_jobs(data)
+    if jobs is None:
+        return jsonify({"error": "Expected a list of jobs or {\"jobs\": [...]}"}), 400
+
+    invalid = next((index for index, job in enumerate(jobs) if not isinstance(job, dict)), None)
+    if invalid is not None:
+        return jsonify({"error": f"Job at index {invalid} is not an object"}), 400
+
+    try:
+        min_score = _prefilter_min_score(data)
+    except (TypeError, ValueError):
+        return jsonify({"error": "min_score must be a number"}), 400
+
+    kept, rejected = [], []
+    for job, score in zip(jobs, score_jobs(jobs, get_cv(), min_score)):
+        if score["passed"]:
+            kept.append({**job, "prescore": score["prescore"]})
+        else:
+            rejected.append({
+                "index": score["index"],
+                "job_title": job.get("job_title"),
+                "company": job.get("company"),
+                "prescore": score["prescore"],
+                "reason": score["reason"],
+            })
+
+    print(f"Prefilter kept {len(kept)}/{len(jobs)} jobs (min score {min_score})")
+    return jsonify({
+        "kept": kept,
+        "rejected": rejected,
+        "min_score": min_score,
+        "llm_calls_saved": len(rejected),
+    })
+
+
+@app.route("/analyze-fit/batch", methods=["POST"])
+def analyze_fit_batch():
+    """Analyze a list of jobs concurrently; one result (or error) per job, in order"""
+    data = request.json
+    jobs = _request_jobs(data)
+    if jobs is None:
+        return jsonify({"error": "Expected a list of jobs or {\"jobs\": [...]}"}), 400
+
+    requested = data.get("max_concurrency", BATCH_CONCURRENCY) if isinstance(data, dict) else BATCH_CONCURRENCY
+    try:
+        concurrency = max(1, min(int(requested), BATCH_MAX_CONCURRENCY, len(jobs) or 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_concurrency must be an integer"}), 400
+
+    # Optional local prefilter: obvious non-fits are skipped without an LLM call
+    skipped = {}
+    if isinstance(data, dict) and data.get("prefilter"):
+        try:
+            min_score = _prefilter_min_score(data)
+        except (TypeError, ValueError):
+            return jsonify({"error": "min_score must be a number"}), 400
+        for score in score_jobs(jobs, get_cv(), min_score):
+            # Invalid items get their per-job error from _analyze_batch_item
+            if not score["passed"] and isinstance(jobs[score["index"]], dict):
+                skipped[score["index"]] = {
+                    "index": score["index"],
+                    "status": "skipped",
+                    "prescore": score["prescore"],
+                    "reason": score["reason"],
+                }
+
+    to_analyze = [index for index in range(len(jobs)) if index not in skipped]
+
+    # "packed" mode sends several jobs per prompt; invalid jobs are answered
+    # with an error straight away since they can't be packed
+    mode = data.get("mode", FIT_ANALYSIS_MODE) if isinstance(data, dict) else FIT_ANALYSIS_MODE
+    packed = mode == "packed"
+    cascade = mode == "cascade"
+    results_by_index = {}
+    if packed:
+        for index in list(to_analyze):
+            missing = missing_job_field(jobs[index])
+            if missing:
+                results_by_index[index] = _analyze_batch_item(index, jobs[index])
+                to_analyze.remove(index)
+
+    started = datetime.now()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if packed:
+            groups = pack_jobs([(i, jobs[i]) for i in to_analyze], get_cv())
+            for group_results in executor.map(run_packed_fit_analysis, groups):
+                results_by_index.update(group_results)
+        else:
+            analyzed = executor.map(
+                _analyze_batch_item, to_analyze, [jobs[i] for i in to_analyze], [cascade] * len(to_analyze)
+            )
+            results_by_index.update(zip(to_analyze, analyzed))
+    results_by_index.update(skipped)
+    results = [results_by_index[index] for index in range(len(jobs))]
+
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    failed = sum(1 for result in results if result["status"] == "error")
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"Batch analyzed {succeeded}/{len(jobs)} jobs in {elapsed:.1f}s "
+          f"(concurrency {concurrency}, {len(skipped)} prefiltered)")
+
+    return jsonify({
+        "results": results,
+        "total": len(jobs),
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": len(skipped),
+        "llm_calls_saved": len(skipped),
+        "mode": "packed" if packed else "cascade" if cascade else "single",
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 2),
+    })
+
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to first byte per endpoint (streams: until headers are sent)"
+)
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.monotonic()
+
+
+@app.after_request
+def _record_request(response):
+    started = g.get("request_started")
+    if started is not None:
+        HTTP_LATENCY.observe(
+            time.monotonic() - started,
+            endpoint=request.endpoint or "unknown",
+            method=request.method,
+            status=str(response.status_code),
+        )
+    return response
+
+
+def _collect_app_stats():
+    # Stats kept by the cache, parser and rate limiter, exported as metrics
+    cache = ANALYSIS_CACHE.stats()
+    parsing = llm_json.stats()
+    limiter = LIMITER.stats()
+    cascade = cascade_stats()
+    snapshot = JOB_SNAPSHOTS.stats()
+    responses = RESPONSE_CACHE.stats()
+    return [
+        ("analysis_cache_requests_total", "counter", "Analysis cache lookups in this process",
+         [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+        ("analysis_cache_entries", "gauge", "Entries in the analysis cache", [({}, cache["size"])]),
+        ("llm_parse_outcomes_total", "counter", "Parsing outcomes of LLM JSON answers",
+         [({"outcome": outcome}, parsing[outcome])
+          for outcome in ("parsed", "repaired", "failed", "invalid", "reasks", "reask_recovered")]),
+        ("llm_rate_limited_total", "counter", "429 answers from the LLM API", [({}, limiter["rate_limited"])]),
+        ("llm_queue_timeouts_total", "counter", "Calls that gave up waiting for LLM capacity",
+         [({}, limiter["timeouts"])]),
+        ("llm_concurrency_limit", "gauge", "Current adaptive LLM concurrency limit",
+         [({}, limiter["concurrency_limit"])]),
+        ("llm_in_flight", "gauge", "LLM calls running", [({}, limiter["in_flight"])]),
+        ("llm_waiting", "gauge", "LLM calls queued in the rate limiter", [({}, limiter["waiting"])]),
+        ("cascade_decisions_total", "counter", "Cascade analyses by deciding tier",
+         [({"tier": "small"}, cascade["decided_by_small"]), ({"tier": "large"}, cascade["escalated"])]),
+        ("job_snapshot_reloads_total", "counter", "Job snapshot rebuilds after store changes",
+         [({}, snapshot["reloads"])]),
+        ("job_snapshot_reload_seconds_total", "counter", "Time spent rebuilding job snapshots",
+         [({}, snapshot["reload_seconds"])]),
+        ("job_snapshot_jobs", "gauge", "Jobs in this process's snapshot", [({}, snapshot["jobs"])]),
+        ("http_cached_responses_total", "counter", "Dashboard/API responses by cache outcome",
+         [({"result": "not_modified"}, responses["not_modified"]), ({"result": "hit"}, responses["hits"]),
+          ({"result": "render"}, responses["renders"])]),
+        ("http_compression_saved_bytes_total", "counter", "Response bytes saved by compression",
+         [({}, responses["bytes_saved"])]),
+    ]
+
+
+REGISTRY.register_collector(_collect_app_stats)
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/metrics/summary", methods=["GET"])
+def metrics_summary():
+    """The same metrics as JSON, with averages and estimated percentiles"""
+    return jsonify(REGISTRY.summary())
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    stats = ANALYSIS_CACHE.stats()
+    stats["prompt_version"] = PROMPT_VERSION
+    return jsonify({
+        "analysis": stats,
+        "description_normalization": job_text.stats(),
+        "llm_json": llm_json.stats(),
+        "coalescing": {
+            "analysis": ANALYSIS_FLIGHTS.stats(),
+            "cover_letter": COVER_LETTER_FLIGHTS.stats(),
+        },
+        "rate_limit": LIMITER.stats(),
+        "cascade": cascade_stats(),
+        "job_snapshot": JOB_SNAPSHOTS.stats(),
+        "responses": RESPONSE_CACHE.stats(),
+    })
+
+
 @app.route("/test", methods=["GET"])
 def test():
     sample_job = {
@@ -200,28 +935,45 @@ def test():
 @app.route("/save-results", methods=["POST"])
 def save_results():
     try:
-        data = request.json
-        with open(RESULTS_FILE, "w") as f:
-            json.dump(data, f, indent=2)
-
-        jobs_count = 0
-        if isinstance(data, list) and len(data) > 0:
-            if "data" in data[0]:
-                jobs_count = len(data[0]["data"])
-
-        print(f"Saved {jobs_count} jobs to {RESULTS_FILE}")
-        return jsonify({"status": "success", "message": f"Saved {jobs_count} jobs", "filepath": RESULTS_FILE})
+        jobs, skipped = extract_jobs(request.json)
+        inserted, updated = JOB_STORE.upsert_many(jobs)
+
+        print(f"Saved {len(jobs)} jobs ({inserted} new, {updated} updated, {skipped} without analysis skipped)"
+              f" to {JOB_STORE_PATH}")
+        return jsonify({
+            "status": "success",
+            "message": f"Saved {len(jobs)} jobs",
+            "inserted": inserted,
+            "updated": updated,
+            "skipped": skipped,
+            "total_jobs": JOB_STORE.count(),
+        })
     except Exception as e:
         print(f"Error saving results: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def generate_cover_letter_coalesced(job, language):
+    """generate_cover_letter, sharing the result with identical in-flight requests"""
+    key = make_key(
+        "cover_letter",
+        language,
+        get_cv_hash(),
+        *[_normalize(job.get(field)) for field in ("job_title", "company", "job_description")],
+        job.get("matching_skills", []),
+        job.get("missing_skills", []),
+    )
+    result = COVER_LETTER_FLIGHTS.do(key, lambda: generate_cover_letter(job, language=language))
+    # Callers may annotate the result (e.g. filepath), so each gets its own copy
+    return dict(result) if result else result
+
+
 @app.route("/generate-cover-letter", methods=["POST"])
 def api_generate_cover_letter():
     try:
         data = request.json
         language = data.get("language", "fr")
-        result = generate_cover_letter(data, language=language)
+        result = generate_cover_letter_coalesced(data, language)
 
         if result:
             if data.get("save", False):
@@ -230,6 +982,9 @@ def api_generate_cover_letter():
             return jsonify(result)
         else:
             return jsonify({"error": "Failed to generate cover letter"}), 500
+    except RateLimitTimeout as e:
+        print(f"Rate limited: {e}")
+        return jsonify({"error": "LLM busy, try again later", "details": str(e)}), 503
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -240,116 +995,168 @@ def api_generate_cover_letter():
 # ============================================================
 
 
-def load_job_data():
+def load_job_snapshot():
+    """The current job snapshot (None if the store can't be read)"""
     try:
-        if os.path.exists(RESULTS_FILE):
-            with open(RESULTS_FILE, "r") as f:
-                data = json.load(f)
-
-            if isinstance(data, list) and len(data) > 0:
-                first_item = data[0]
-                if isinstance(first_item, dict) and "json" in first_item:
-                    inner_data = first_item["json"]
-                    if isinstance(inner_data, dict) and "data" in inner_data:
-                        jobs = inner_data["data"]
-                        print(f"Loaded {len(jobs)} jobs from file")
-                        return jobs
-                elif isinstance(first_item, dict) and "data" in first_item:
-                    jobs = first_item["data"]
-                    print(f"Loaded {len(jobs)} jobs from file")
-                    return jobs
-                elif isinstance(first_item, dict) and "overall_score" in first_item:
-                    print(f"Loaded {len(data)} jobs from file")
-                    return data
-
-            print("Couldn't parse job data structure")
-            return []
-        else:
-            print(f"File doesn't exist: {RESULTS_FILE}")
-            return []
+        return JOB_SNAPSHOTS.get()
     except Exception as e:
         print(f"Error loading job data: {e}")
-        return []
+        return None
+
 
+def job_statistics():
+    """Store statistics, read from the maintained aggregates (O(1) in the number of jobs)"""
+    try:
+        return JOB_STORE.statistics()
+    except Exception as e:
+        print(f"Error loading job statistics: {e}")
+        return JOB_STORE_EMPTY_STATS
 
-def calculate_statistics(jobs):
-    if not jobs:
-        return {
-            "total_jobs": 0, "avg_score": 0, "high_priority": 0,
-            "medium_priority": 0, "low_priority": 0, "avg_skills_match": 0,
-        }
 
-    scores = [job.get("overall_score", 0) for job in jobs if "overall_score" in job]
-    skills_scores = [job.get("skills_match_score", 0) for job in jobs]
-    avg_skills_raw = sum(skills_scores) / len(skills_scores) if skills_scores else 0
-    avg_skills_percent = (avg_skills_raw / 40) * 100
+def top_missing_skills(limit=10):
+    try:
+        return JOB_STORE.top_skills("missing", limit)
+    except Exception as e:
+        print(f"Error loading skill counts: {e}")
+        return []
 
-    return {
-        "total_jobs": len(jobs),
-        "avg_score": round(sum(scores) / len(scores), 1) if scores else 0,
-        "high_priority": len([s for s in scores if s >= 75]),
-        "medium_priority": len([s for s in scores if 65 <= s < 75]),
-        "low_priority": len([s for s in scores if s < 65]),
-        "avg_skills_match": round(avg_skills_percent, 1),
-    }
 
+def dashboard_jobs(snapshot):
+    """The jobs shown on the dashboard, best first (cover letter indexes point into it)"""
+    return snapshot.jobs if snapshot else ()
 
-def extract_skills(jobs):
-    all_skills = []
-    for job in jobs:
-        if "missing_skills" in job:
-            all_skills.extend(job["missing_skills"])
-    skill_counts = Counter(all_skills)
-    return skill_counts.most_common(10)
 
+def job_store_revision():
+    """The store's (version, last write time), or None if it can't be read"""
+    try:
+        return JOB_STORE.revision()
+    except Exception as e:
+        print(f"Error reading job store version: {e}")
+        return None
 
-def get_top_missing_skills(jobs, top_n=10):
-    if not jobs:
-        return []
-    all_missing = []
-    for job in jobs:
-        missing = job.get("missing_skills", [])
-        if missing:
-            all_missing.extend(missing)
-    skill_counts = Counter(all_missing)
-    return skill_counts.most_common(top_n)
 
+def cached_response(variant, render, mimetype):
+    """render()'s body for this data version, with ETag / 304 handling and compression"""
+    revision = job_store_revision()
+    if revision is None:
+        return Response(render(), mimetype=mimetype)
+    return RESPONSE_CACHE.response(variant, revision, render, mimetype)
 
-@app.route("/")
-def index():
-    jobs = load_job_data()
-    stats = calculate_statistics(jobs)
-    top_skills = extract_skills(jobs)
-    top_missing = get_top_missing_skills(jobs)
-    jobs_sorted = sorted(jobs, key=lambda x: x.get("overall_score", 0), reverse=True)
+
+def render_dashboard():
+    snapshot = load_job_snapshot()
+    jobs = dashboard_jobs(snapshot)
+    stats = snapshot.statistics if snapshot else JOB_STORE_EMPTY_STATS
+    top_missing = top_missing_skills(10)
+    revision = job_store_revision()
+    updated = datetime.fromtimestamp(revision[1]) if revision else datetime.now()
 
     return render_template(
         "dashboard.html",
-        jobs=jobs_sorted,
+        jobs=jobs,
         stats=stats,
-        top_skills=top_skills,
+        top_skills=top_missing,
         top_missing=top_missing,
-        last_updated=datetime.now().strftime("%Y-%m-%d %H:%M"),
+        last_updated=updated.strftime("%Y-%m-%d %H:%M"),
     )
 
 
+@app.route("/")
+def index():
+    return cached_response(f"/:{DASHBOARD_TEMPLATE_VERSION}", render_dashboard, "text/html")
+
+
+def _flag(value):
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"Expected true or false, got {value!r}")
+
+
+def _job_query(args):
+    """/api/jobs query parameters -> JobStore.query keyword arguments"""
+    filters = {}
+    for name in ("min_score", "max_score"):
+        if args.get(name):
+            filters[name] = float(args[name])
+    if args.get("priority"):
+        filters["priority"] = [p.strip().capitalize() for p in args["priority"].split(",") if p.strip()]
+    for name in ("company", "skill", "skill_kind", "analyzed_after", "analyzed_before"):
+        if args.get(name):
+            filters[name] = args[name].strip()
+    if args.get("should_apply"):
+        filters["should_apply"] = _flag(args["should_apply"])
+
+    limit = int(args.get("limit", API_JOBS_PAGE_SIZE))
+    if not 1 <= limit <= API_JOBS_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {API_JOBS_MAX_PAGE_SIZE}")
+    return {
+        "filters": filters,
+        "sort": args.get("sort", "score"),
+        "descending": args.get("order", "desc").lower() != "asc",
+        "limit": limit,
+        "cursor": args.get("cursor") or None,
+    }
+
+
 @app.route("/api/jobs")
 def api_jobs():
-    jobs = load_job_data()
-    return jsonify(jobs)
+    """
+    One page of stored jobs
+
+    Query parameters: min_score, max_score, priority (comma-separated),
+    company (substring), skill (+ skill_kind=matching|missing), should_apply,
+    analyzed_after / analyzed_before (ISO dates), sort (score, analyzed_at,
+    company, title), order (asc|desc), limit and cursor (next_cursor of the
+    previous page).
+    """
+
+    try:
+        query = _job_query(request.args)
+
+        def render():
+            jobs, next_cursor = JOB_STORE.query(**query)
+            return app.json.dumps({"jobs": jobs, "count": len(jobs), "next_cursor": next_cursor})
+
+        return cached_response(request.full_path, render, "application/json")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 
 @app.route("/api/stats")
 def api_stats():
-    jobs = load_job_data()
-    stats = calculate_statistics(jobs)
-    return jsonify(stats)
+    def render():
+        return app.json.dumps(job_statistics())
+
+    return cached_response("/api/stats", render, "application/json")
+
+
+@app.route("/api/stats/check")
+def api_stats_check():
+    """Recompute the statistics from scratch and compare them with the maintained ones"""
+    started = time.perf_counter()
+    result = JOB_STORE.check_aggregates()
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    if not result["consistent"]:
+        print(f"Job store aggregates drifted: {result['differences']}")
+    return jsonify(result)
+
+
+def _dashboard_job_data(job):
+    return {
+        "job_title": job.get("title", job.get("job_title", "Unknown")),
+        "company": job.get("company", "Unknown"),
+        "job_description": job.get("description", job.get("job_description", "")),
+        "matching_skills": job.get("matching_skills", []),
+        "missing_skills": job.get("missing_skills", []),
+    }
 
 
 @app.route("/dashboard/generate-cover-letter/<int:job_index>")
 def dashboard_generate_cover_letter(job_index):
     """Generate cover letter for a specific job (called from dashboard)"""
-    jobs = load_job_data()
+    jobs = dashboard_jobs(load_job_snapshot())
 
     if job_index >= len(jobs):
         return jsonify({"error": "Job not found"}), 404
@@ -358,16 +1165,7 @@ def dashboard_generate_cover_letter(job_index):
     language = request.args.get("language", "fr")
 
     try:
-        result = generate_cover_letter(
-            {
-                "job_title": job.get("title", job.get("job_title", "Unknown")),
-                "company": job.get("company", "Unknown"),
-                "job_description": job.get("description", job.get("job_description", "")),
-                "matching_skills": job.get("matching_skills", []),
-                "missing_skills": job.get("missing_skills", []),
-            },
-            language=language,
-        )
+        result = generate_cover_letter_coalesced(_dashboard_job_data(job), language=language)
 
         if result:
             try:
@@ -384,6 +1182,36 @@ def dashboard_generate_cover_letter(job_index):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/dashboard/generate-cover-letter/<int:job_index>/stream")
+def dashboard_stream_cover_letter(job_index):
+    """Cover letter for the dashboard, streamed as Server-Sent Events"""
+    jobs = dashboard_jobs(load_job_snapshot())
+
+    if job_index >= len(jobs):
+        return jsonify({"error": "Job not found"}), 404
+
+    job_data = _dashboard_job_data(jobs[job_index])
+    language = request.args.get("language", "fr")
+
+    def events():
+        yield sse_event("start", {"job_title": job_data["job_title"], "company": job_data["company"]})
+        try:
+            for kind, value in stream_cover_letter(job_data, language=language):
+                if kind == "token":
+                    yield sse_event("token", {"text": value})
+                    continue
+                try:
+                    save_cover_letter(value)
+                except Exception as e:
+                    print(f"Could not save cover letter to file: {e}")
+                yield sse_event("result", value)
+        except Exception as e:
+            print(f"Cover letter generation error: {e}")
+            yield sse_event("error", {"error": str(e)})
+
+    return sse_response(events())
+
+
 # ============================================================
 # RUN
 # ============================================================
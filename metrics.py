@@ -0,0 +1,192 @@
+"""
+Metrics - In-process counters and histograms, exported for Prometheus
+
+Instrumented code registers metrics on REGISTRY and updates them with
+labels; /metrics renders everything in the Prometheus text format and
+/metrics/summary as JSON (counts, averages and estimated percentiles).
+Values already tracked elsewhere (cache, rate limiter, JSON parsing) are
+exported through collectors instead of being counted twice.
+
+Metrics are per process: with several gunicorn workers, each scrape sees the
+worker that answered it (Prometheus aggregates them by instance).
+"""
+
+import threading
+
+# Seconds, from a cache hit to a slow 70B answer stuck behind the rate limiter
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(round(value, 9)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+    def summary(self):
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    result.append((f"{self.name}_bucket", key + (("le", _format_value(float(bound))),), cumulative))
+                result.append((f"{self.name}_bucket", key + (("le", "+Inf"),), series["count"]))
+                result.append((f"{self.name}_sum", key, round(series["sum"], 6)))
+                result.append((f"{self.name}_count", key, series["count"]))
+        return result
+
+    def _quantile(self, series, q):
+        # Upper bound of the bucket holding the q-th observation (None: past the last bucket)
+        target = q * series["count"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, series["counts"]):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return None
+
+    def summary(self):
+        with self._lock:
+            return [
+                {
+                    "labels": dict(key),
+                    "count": series["count"],
+                    "sum": round(series["sum"], 3),
+                    "avg": round(series["sum"] / series["count"], 3),
+                    "p50": self._quantile(series, 0.5),
+                    "p95": self._quantile(series, 0.95),
+                    "p99": self._quantile(series, 0.99),
+                }
+                for key, series in sorted(self._series.items())
+                if series["count"]
+            ]
+
+
+class Registry:
+    """All metrics of the process, plus collectors for stats kept elsewhere"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, buckets))
+
+    def register_collector(self, collect):
+        """
+        Add a callable returning [(name, kind, help, [(labels dict, value), ...]), ...]
+
+        kind is "counter" or "gauge"; it is called on every scrape.
+        """
+
+        self._collectors.append(collect)
+
+    def _collected(self):
+        families = []
+        for collect in self._collectors:
+            try:
+                families.extend(collect())
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        return families
+
+    def render(self):
+        """Everything in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        for name, kind, help_text, values in self._collected():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """JSON-friendly view: counters, histogram percentiles, collected values"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        result = {metric.name: metric.summary() for metric in metrics}
+        for name, _, _, values in self._collected():
+            result[name] = [{"labels": labels, "value": value} for labels, value in values]
+        return result
+
+
+REGISTRY = Registry()
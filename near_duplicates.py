@@ -0,0 +1,149 @@
+"""
+Near Duplicates - SimHash based detection of reposted / cross-posted jobs
+
+The same offer often comes back under several Adzuna redirect URLs, or is
+reposted with tiny edits. Each copy would cost a full /analyze-fit call, so
+jobs whose title + company + description fingerprints are close enough are
+collapsed onto the first (canonical) job, which keeps the other URLs.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.85
+
+
+def normalize_text(text):
+    """Lowercase, strip accents/markup/punctuation and collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"<[^>]+>", " ", text.lower())
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    return text.strip()
+
+
+def job_fingerprint_text(job):
+    """Text a job is fingerprinted on: title + company + description"""
+    return " ".join(
+        normalize_text(job.get(field, ""))
+        for field in ("job_title", "company", "job_description")
+    )
+
+
+def simhash(text, bits=SIMHASH_BITS):
+    """64-bit SimHash over word shingles"""
+    words = text.split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [
+            " ".join(words[i : i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        ]
+
+    weights = [0] * bits
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=bits // 8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def similarity(a, b, bits=SIMHASH_BITS):
+    """Fraction of identical bits between two fingerprints"""
+    return 1 - bin(a ^ b).count("1") / bits
+
+
+class NearDuplicateDetector:
+    """
+    Streaming near-duplicate detector using SimHash + LSH banding
+
+    Fingerprints are split into max_distance + 1 bands, so by the pigeonhole
+    principle any pair within max_distance differing bits shares at least
+    one identical band and is found without comparing against every job.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, bits=SIMHASH_BITS):
+        """
+        Args:
+            threshold: Minimum similarity (0-1) for two jobs to be duplicates
+            bits: SimHash width
+        """
+
+        self.threshold = threshold
+        self.bits = bits
+        self.max_distance = int((1 - threshold) * bits)
+
+        bands = min(self.max_distance + 1, bits)
+        width, extra = divmod(bits, bands)
+        self._bands = []
+        start = 0
+        for band in range(bands):
+            size = width + (1 if band < extra else 0)
+            self._bands.append((start, (1 << size) - 1))
+            start += size
+
+        self._buckets = {}
+        self._canonical = []
+        self.duplicates = 0
+
+    def add(self, job):
+        """
+        Register a job
+
+        Returns:
+            The canonical job this one duplicates (its URL is added to the
+            canonical job's alternate_urls), or None if the job is new
+        """
+
+        fingerprint = simhash(job_fingerprint_text(job), self.bits)
+        keys = [
+            (band, fingerprint >> shift & mask)
+            for band, (shift, mask) in enumerate(self._bands)
+        ]
+
+        candidates = set()
+        for key in keys:
+            candidates.update(self._buckets.get(key, ()))
+
+        for index in sorted(candidates):
+            canonical_fingerprint, canonical = self._canonical[index]
+            if similarity(fingerprint, canonical_fingerprint, self.bits) >= self.threshold:
+                url = job.get("job_url")
+                alternates = canonical.setdefault("alternate_urls", [])
+                if url and url != canonical.get("job_url") and url not in alternates:
+                    alternates.append(url)
+                self.duplicates += 1
+                return canonical
+
+        index = len(self._canonical)
+        self._canonical.append((fingerprint, job))
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        return None
+
+
+def collapse_near_duplicates(jobs, threshold=DEFAULT_THRESHOLD):
+    """
+    Collapse near-duplicate jobs onto their first occurrence
+
+    Args:
+        jobs: List of job dictionaries
+        threshold: Minimum similarity (0-1) for two jobs to be duplicates
+
+    Returns:
+        Tuple of (canonical jobs, number of duplicates removed)
+    """
+
+    detector = NearDuplicateDetector(threshold)
+    canonical = [job for job in jobs if detector.add(job) is None]
+    return canonical, detector.duplicates
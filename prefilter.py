@@ -0,0 +1,111 @@
+"""
+Prefilter - Cheap local scoring of jobs against the CV before the LLM
+
+Most Adzuna results are clear mismatches that would score well below the
+apply threshold anyway. This stage scores every job with log-scaled term
+frequency vectors (unigrams + bigrams) and cosine similarity to the CV, with
+no network calls, so obvious non-fits are rejected before paying for
+/analyze-fit.
+
+A job's score only depends on the job and the CV, not on the rest of the
+batch, so MIN_SCORE means the same thing for a batch of 5 or 500 postings.
+(Batch-wide IDF weights made it drift: a Data Engineer posting scored 6.4
+among unrelated jobs and 2.1 among other data jobs.) Words every posting
+uses ("experience", "team") are stopwords instead.
+"""
+
+import math
+import os
+from collections import Counter
+
+from near_duplicates import normalize_text
+
+# Unrelated postings (nursing, sales, kitchen) score 0-4, data jobs sharing a
+# few tools with the CV 5+, see test_prefilter.py; err on the side of keeping
+MIN_SCORE = float(os.getenv("PREFILTER_MIN_SCORE", "3"))
+
+STOPWORDS = set(
+    """
+    a an and are as at be by for from has have in is it of on or our that the
+    their this to we will with you your who what which can all also more
+    le la les un une des de du et en est pour par sur au aux avec dans nous
+    vous votre vos notre nos ce cette ces qui que son sa ses il elle ils sont
+    h f hf cdi poste profil mission missions
+    experience years year team work working required requirements role job
+    skills strong excellent ability join looking plus including within
+    """.split()
+)
+
+
+def tokenize(text):
+    """Normalized unigrams and bigrams, without stopwords"""
+    words = [w for w in normalize_text(text).split() if w not in STOPWORDS and len(w) > 1]
+    bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words + bigrams
+
+
+def _job_text(job):
+    if not isinstance(job, dict):
+        return ""
+    return " ".join(
+        str(job.get(field) or "")
+        for field in ("job_title", "title", "job_description", "description")
+    )
+
+
+def _vector(terms):
+    """Unit-length log-scaled term frequencies"""
+    vector = {term: 1 + math.log(tf) for term, tf in Counter(terms).items()}
+    norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+    return {term: w / norm for term, w in vector.items()}
+
+
+def score_jobs(jobs, cv, min_score=MIN_SCORE):
+    """
+    Score a batch of jobs against the CV in one pass
+
+    Each job is scored on its own (see the module docstring), the CV is
+    tokenized once for the batch.
+
+    Args:
+        jobs: List of job dictionaries (job_title/job_description); other
+            items are rejected as invalid
+        cv: CV text
+        min_score: Jobs scoring below this (0-100) are rejected
+
+    Returns:
+        List of dicts, one per job: index, prescore, passed, reason, shared_terms
+    """
+
+    cv_vector = _vector(tokenize(cv))
+
+    results = []
+    for index, job in enumerate(jobs):
+        terms = tokenize(_job_text(job))
+        vector = _vector(terms)
+        similarity = sum(w * cv_vector.get(term, 0.0) for term, w in vector.items())
+        prescore = round(100 * similarity, 1)
+
+        shared = [term for term, _ in Counter(terms).most_common() if term in cv_vector]
+        passed = prescore >= min_score and bool(terms)
+
+        if not isinstance(job, dict):
+            reason = "Invalid job (expected an object)"
+        elif not terms:
+            reason = "Empty job description"
+        elif passed:
+            reason = f"CV overlap {prescore} >= {min_score}"
+        elif shared:
+            reason = f"Low CV overlap ({prescore} < {min_score}); shared terms: {', '.join(shared[:5])}"
+        else:
+            reason = f"No overlap with CV ({prescore} < {min_score})"
+
+        results.append({
+            "index": index,
+            "prescore": prescore,
+            "passed": passed,
+            "reason": reason,
+            "shared_terms": shared[:10],
+        })
+
+    return results
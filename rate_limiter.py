@@ -0,0 +1,311 @@
+"""
+Rate Limiter - Process-wide, adaptive limiter for LLM (Groq) calls
+
+Every LLM call in the app goes through LIMITER, which enforces:
+- token buckets for requests-per-minute and tokens-per-minute
+- a concurrency limit adapted with AIMD: +1 slot per window of successful
+  calls, halved on a 429 (or shrunk when latency exceeds the target)
+- a queue with deadlines: callers wait for capacity (and for Retry-After
+  after a 429) instead of failing, and only give up once their deadline passes
+
+Configure with GROQ_RPM, GROQ_TPM, LLM_MAX_CONCURRENCY, LLM_QUEUE_TIMEOUT,
+LLM_LATENCY_TARGET and LLM_MAX_RETRIES.
+"""
+
+import os
+import random
+import threading
+import time
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call could not get LLM capacity before its deadline"""
+
+
+def is_rate_limit_error(error):
+    """Whether an exception from the groq / langchain clients is a 429"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error):
+    """Retry-After from a 429 error's response headers, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def used_tokens(result):
+    """Total tokens reported by a gateway response or a groq completion"""
+    if getattr(result, "total_tokens", None):
+        return result.total_tokens
+    usage = getattr(result, "usage", None)
+    if usage is not None and getattr(usage, "total_tokens", None):
+        return usage.total_tokens
+    metadata = getattr(result, "usage_metadata", None) or {}
+    if metadata.get("total_tokens"):
+        return metadata["total_tokens"]
+    token_usage = (getattr(result, "response_metadata", None) or {}).get("token_usage") or {}
+    return token_usage.get("total_tokens")
+
+
+def _trace(trace, permit, attempt):
+    if trace is not None:
+        trace["queue_seconds"] = trace.get("queue_seconds", 0.0) + permit.queued_seconds
+        trace["retries"] = attempt
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously, sized per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount can be taken (0 if available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta):
+        # Correct an estimate once real usage is known (may go into debt)
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class Permit:
+    """Capacity granted to one call; release() must be called exactly once"""
+
+    def __init__(self, limiter, tokens, queued_seconds):
+        self.limiter = limiter
+        self.tokens = tokens
+        self.queued_seconds = queued_seconds
+
+    def release(self, latency=None, actual_tokens=None, rate_limited=False, retry_after=None):
+        self.limiter._release(self, latency, actual_tokens, rate_limited, retry_after)
+
+
+class AdaptiveLimiter:
+    """RPM/TPM token buckets plus an AIMD-adapted concurrency limit"""
+
+    def __init__(
+        self,
+        rpm=30,
+        tpm=12000,
+        max_concurrency=8,
+        min_concurrency=1,
+        queue_timeout=120.0,
+        latency_target=30.0,
+        max_retries=3,
+    ):
+        self.requests = TokenBucket(rpm)
+        self.token_bucket = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+
+        self.limit = float(max(min_concurrency, min(4, max_concurrency)))
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+
+        self._cond = threading.Condition()
+        self.counters = {
+            "calls": 0,
+            "rate_limited": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "queue_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls):
+        """
+        Limiter configured from the environment
+
+        GROQ_RPM / GROQ_TPM are the account's limits; each of the
+        WEB_CONCURRENCY gunicorn workers gets an equal share of them.
+        """
+
+        workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        return cls(
+            rpm=max(1, int(os.getenv("GROQ_RPM", "30")) // workers),
+            tpm=max(1, int(os.getenv("GROQ_TPM", "12000")) // workers),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "120")),
+            latency_target=float(os.getenv("LLM_LATENCY_TARGET", "30")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+        )
+
+    def acquire(self, tokens, timeout=None):
+        """
+        Wait for a concurrency slot plus request and token budget
+
+        Raises:
+            RateLimitTimeout if capacity isn't available within timeout
+        """
+
+        started = time.monotonic()
+        deadline = started + (self.queue_timeout if timeout is None else timeout)
+
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now < self.paused_until:
+                        wait = self.paused_until - now
+                    elif self.in_flight >= int(self.limit):
+                        wait = None  # until a running call releases its slot
+                    else:
+                        wait = max(
+                            self.requests.wait_time(1, now),
+                            self.token_bucket.wait_time(tokens, now),
+                        )
+                        if wait == 0:
+                            self.requests.take(1)
+                            self.token_bucket.take(tokens)
+                            self.in_flight += 1
+                            queued = now - started
+                            self.counters["queue_seconds"] += queued
+                            return Permit(self, tokens, queued)
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.counters["timeouts"] += 1
+                        raise RateLimitTimeout(
+                            f"No LLM capacity within {deadline - started:.1f}s "
+                            f"({self.in_flight} in flight, limit {int(self.limit)})"
+                        )
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self.waiting -= 1
+
+    def _release(self, permit, latency, actual_tokens, rate_limited, retry_after):
+        with self._cond:
+            self.in_flight -= 1
+            self.counters["calls"] += 1
+            if actual_tokens:
+                self.token_bucket.adjust(actual_tokens - permit.tokens)
+
+            if rate_limited:
+                # Multiplicative decrease, and hold everyone until Retry-After
+                self.counters["rate_limited"] += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                pause = retry_after if retry_after is not None else 1 + random.random()
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            elif latency is not None and latency > self.latency_target:
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            elif latency is not None:
+                # Additive increase: about +1 slot per `limit` successful calls
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+            self._cond.notify_all()
+
+    def call(self, fn, tokens, timeout=None, trace=None):
+        """
+        Run fn() under the limiter, retrying 429s until the deadline
+
+        Args:
+            fn: Zero-argument callable making one LLM request
+            tokens: Estimated prompt + completion tokens for the request
+            timeout: Seconds the call may spend queued/retrying in total
+            trace: Optional dict, filled with queue_seconds and retries
+
+        Returns:
+            fn's result
+        """
+
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        attempt = 0
+        while True:
+            permit = self.acquire(tokens, deadline - time.monotonic())
+            _trace(trace, permit, attempt)
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    permit.release()
+                    raise
+                permit.release(rate_limited=True, retry_after=retry_after_seconds(e))
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._cond:
+                    self.counters["retries"] += 1
+                print(f"LLM rate limited (429), retry {attempt}/{self.max_retries}")
+                continue
+
+            permit.release(latency=time.monotonic() - started, actual_tokens=used_tokens(result))
+            return result
+
+    def stream(self, fn, tokens, timeout=None, trace=None):
+        """
+        Like call(), for a streaming request: fn() returns an iterator of chunks
+
+        The slot is held until the stream is exhausted or closed. A 429 is
+        only retried if it happens before the first chunk.
+        """
+
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        attempt = 0
+        while True:
+            permit = self.acquire(tokens, deadline - time.monotonic())
+            _trace(trace, permit, attempt)
+            started = time.monotonic()
+            released = produced = False
+            try:
+                for chunk in fn():
+                    produced = True
+                    yield chunk
+            except Exception as e:
+                if produced or not is_rate_limit_error(e):
+                    raise
+                released = True
+                permit.release(rate_limited=True, retry_after=retry_after_seconds(e))
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._cond:
+                    self.counters["retries"] += 1
+                print(f"LLM rate limited (429), retry {attempt}/{self.max_retries}")
+                continue
+            finally:
+                if not released:
+                    # Also runs when the client disconnects mid-stream
+                    permit.release(latency=time.monotonic() - started if produced else None)
+            return
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self.counters)
+            stats.update({
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            })
+        stats["queue_seconds"] = round(stats["queue_seconds"], 3)
+        return stats
+
+
+# Shared by every LLM call in this process (fit analysis and cover letters)
+LIMITER = AdaptiveLimiter.from_env()
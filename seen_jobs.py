@@ -0,0 +1,107 @@
+"""
+Seen Jobs - Persistent index of job postings already returned by a search
+
+Used by the incremental search mode so daily runs only emit postings that
+have not been seen (and analyzed) before.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+
+def job_key(job):
+    """Stable identity for a job: the Adzuna ID when known, else its URL"""
+    if job.get("job_id"):
+        return f"{job.get('source', 'job').lower()}:{job['job_id']}"
+    return job.get("job_url") or None
+
+
+class SeenJobIndex:
+    """SQLite-backed set of seen jobs with created_date and first-seen time"""
+
+    def __init__(self, path, retention_days=30):
+        """
+        Args:
+            path: SQLite file to use (parent directories are created)
+            retention_days: Entries older than this are pruned on load
+        """
+
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                job_key TEXT PRIMARY KEY,
+                job_id TEXT,
+                job_url TEXT,
+                created_date TEXT,
+                first_seen TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_first_seen ON seen_jobs(first_seen)")
+        self._conn.commit()
+
+        self.pruned = self.prune()
+        self._keys = {
+            row[0] for row in self._conn.execute("SELECT job_key FROM seen_jobs")
+        }
+
+    def __contains__(self, job):
+        key = job_key(job)
+        return key is not None and key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, jobs):
+        """Record jobs as seen (jobs already in the index keep their first_seen)"""
+
+        now = _iso(datetime.now(timezone.utc))
+        rows = []
+        for job in jobs:
+            key = job_key(job)
+            if key is None:
+                continue
+            rows.append(
+                (key, job.get("job_id"), job.get("job_url"), job.get("created_date"), now)
+            )
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_jobs"
+                " (job_key, job_id, job_url, created_date, first_seen)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._keys.update(row[0] for row in rows)
+
+    def prune(self):
+        """
+        Drop entries first seen before the retention window whose posting
+        date (when known) is also outside it
+
+        Returns:
+            Number of entries removed
+        """
+
+        cutoff = _iso(datetime.now(timezone.utc) - timedelta(days=self.retention_days))
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM seen_jobs WHERE first_seen < ?"
+                " AND (created_date IS NULL OR created_date < ?)",
+                (cutoff, cutoff),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+
+def _iso(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
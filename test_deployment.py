@@ -0,0 +1,100 @@
+"""
+Deployment check: gunicorn.conf.py serves cheap endpoints during slow LLM calls
+
+Boots `gunicorn main:app --config gunicorn.conf.py` (as the Procfile does)
+with the fake LLM backend, starts several slow fit analyses, and checks that
+/health answers while they are in flight. Uses temporary stores, so nothing
+in the repo is touched.
+
+Run with `python test_deployment.py` (or pytest).
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FAKE_LATENCY = 3.0
+SLOW_REQUESTS = 6
+
+JOB = {
+    "job_title": "Data Scientist",
+    "company": "Acme",
+    "job_description": "Python, SQL and machine learning for retail forecasting.",
+}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url, timeout=10):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status
+
+
+def _analyze(url, company):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(dict(JOB, company=company)).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.status
+
+
+def test_health_stays_responsive_during_slow_analyses():
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            PORT=str(port),
+            LLM_BACKEND="fake",
+            FAKE_LLM_LATENCY=str(FAKE_LATENCY),
+            FAKE_LLM_JITTER="0",
+            JOB_STORE_PATH=os.path.join(tmp, "jobs.sqlite3"),
+            ANALYSIS_CACHE_PATH=os.path.join(tmp, "analysis_cache.sqlite3"),
+        )
+        env.pop("WEB_CONCURRENCY", None)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "main:app", "--config", "gunicorn.conf.py"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    _get(f"{base}/health", timeout=1)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise AssertionError("gunicorn did not start")
+                    time.sleep(0.2)
+
+            with ThreadPoolExecutor(SLOW_REQUESTS) as executor:
+                slow = [executor.submit(_analyze, f"{base}/analyze-fit", f"Acme {i}") for i in range(SLOW_REQUESTS)]
+                time.sleep(0.5)
+                started = time.monotonic()
+                assert _get(f"{base}/health") == 200
+                health_seconds = time.monotonic() - started
+                assert not all(future.done() for future in slow), "analyses finished before /health was checked"
+                assert [future.result() for future in slow] == [200] * SLOW_REQUESTS
+
+            assert health_seconds < 1, f"/health took {health_seconds:.2f}s behind slow analyses"
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    test_health_stays_responsive_during_slow_analyses()
+    print("ok  test_health_stays_responsive_during_slow_analyses")
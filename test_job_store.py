@@ -0,0 +1,179 @@
+"""
+Checks for JobStore: maintained aggregates after inserts and updates, keyset paging
+
+Run with `python test_job_store.py` (or pytest).
+"""
+
+import base64
+import json
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+
+from job_store import SORT_KEYS, JobStore
+
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "AWS", "dbt", "Kafka", "Docker"]
+
+
+@contextmanager
+def _store():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(os.path.join(tmp, "jobs.sqlite3"))
+        yield store
+        store._connect().close()
+
+
+def _job(i, score, matching, missing, breakdown=None):
+    job = {
+        "job_id": str(i),
+        "title": f"Data Engineer {i}",
+        "company": f"Company {i % 7}",
+        "overall_score": score,
+        "matching_skills": matching,
+        "missing_skills": missing,
+    }
+    if breakdown:
+        job["breakdown"] = breakdown
+    return job
+
+
+def _random_jobs(rng, ids):
+    return [
+        _job(
+            i,
+            rng.choice([None, 0, 9.5, 10, 64.9, 65, 74, 75, 99.5, 100, rng.uniform(0, 100)]),
+            rng.sample(SKILLS, rng.randint(0, 4)),
+            ", ".join(rng.sample(SKILLS, rng.randint(0, 3))),
+            {"skills_match": rng.randint(0, 40), "experience_level": rng.randint(0, 25)} if rng.random() < 0.7 else None,
+        )
+        for i in ids
+    ]
+
+
+def _assert_matches_rebuild(store):
+    check = store.check_aggregates()
+    assert check["consistent"], check["differences"]
+
+    totals, histogram, skills = store._stored_aggregates()
+    statistics = store.statistics()
+    top_missing = store.top_skills("missing", limit=None)
+    store.rebuild_aggregates()
+    rebuilt_totals, rebuilt_histogram, rebuilt_skills = store._stored_aggregates()
+
+    assert {name: round(value, 6) for name, value in totals.items()} == \
+        {name: round(value, 6) for name, value in rebuilt_totals.items()}
+    assert histogram == rebuilt_histogram
+    assert skills == rebuilt_skills
+    assert statistics == store.statistics()
+    assert top_missing == store.top_skills("missing", limit=None)
+
+
+def test_aggregates_after_inserts():
+    with _store() as store:
+        assert store.upsert_many(_random_jobs(random.Random(1), range(200))) == (200, 0)
+        _assert_matches_rebuild(store)
+
+
+def test_aggregates_after_score_and_skill_updates():
+    rng = random.Random(2)
+    with _store() as store:
+        store.upsert_many(_random_jobs(rng, range(200)))
+        # Re-analyses: scores move across priority and histogram buckets (or
+        # disappear), skills are added and removed; some new jobs in between
+        for batch in range(5):
+            ids = rng.sample(range(250), 80)
+            inserted, updated = store.upsert_many(_random_jobs(rng, ids))
+            assert inserted + updated == len(ids)
+            check = store.check_aggregates()
+            assert check["consistent"], (batch, check["differences"])
+        _assert_matches_rebuild(store)
+
+
+def test_aggregates_when_a_batch_repeats_a_job():
+    with _store() as store:
+        store.upsert_many([_job(1, 80, ["Python"], ["Spark"])])
+        store.upsert_many([
+            _job(1, 40, ["Python", "SQL"], []),
+            _job(1, None, [], ["Spark", "Kafka"]),
+            _job(2, 70, ["SQL"], ["Spark"]),
+        ])
+        assert store.statistics()["total_jobs"] == 2
+        assert dict(store.top_skills("missing")) == {"Spark": 2, "Kafka": 1}
+        assert store.top_skills("matching") == [("SQL", 1)]
+        _assert_matches_rebuild(store)
+
+
+def _paging_store(store):
+    """Jobs with tied scores, NULL scores and NULL dates, companies and titles"""
+    store.upsert_many(
+        dict(_job(i, [None, 50, 50, 50, 72.5][i % 5], [], []),
+             company=None if i % 4 == 0 else f"Company {i % 3}",
+             title=None if i % 6 == 0 else f"Data Engineer {i % 4}")
+        for i in range(53)
+    )
+    conn = store._connect()
+    with conn:
+        conn.execute("UPDATE jobs SET analyzed_at = NULL WHERE CAST(substr(id, 8) AS INTEGER) % 3 = 0")
+        conn.execute("UPDATE jobs SET analyzed_at = '2026-01-0' || (CAST(substr(id, 8) AS INTEGER) % 2 + 1)"
+                     " WHERE analyzed_at IS NOT NULL")
+    nulls = conn.execute("SELECT COUNT(*) - COUNT(analyzed_at), COUNT(*) - COUNT(company),"
+                         " COUNT(*) - COUNT(title), COUNT(*) - COUNT(overall_score) FROM jobs").fetchone()
+    assert all(tuple(nulls)), tuple(nulls)
+    return {row["id"] for row in conn.execute("SELECT id FROM jobs")}
+
+
+def test_cursor_pages_return_every_job_once():
+    with _store() as store:
+        ids = _paging_store(store)
+        for sort in SORT_KEYS:
+            for descending in (True, False):
+                for limit in (1, 7, 53, 100):
+                    seen, cursor, pages = [], None, 0
+                    while True:
+                        jobs, cursor = store.query(sort=sort, descending=descending, limit=limit, cursor=cursor)
+                        seen.extend(job["id"] for job in jobs)
+                        pages += 1
+                        if not cursor:
+                            break
+                        assert pages <= len(ids), (sort, descending, limit)
+                    label = (sort, descending, limit)
+                    assert len(seen) == len(set(seen)) and set(seen) == ids, label
+                    # The last page (even an exactly full one) has no next_cursor
+                    assert pages == -(-len(ids) // limit), label
+
+
+def test_cursor_pages_follow_the_sort_order():
+    with _store() as store:
+        _paging_store(store)
+        for descending in (True, False):
+            jobs, cursor = [], None
+            while True:
+                page, cursor = store.query(sort="score", descending=descending, limit=4, cursor=cursor)
+                jobs.extend(page)
+                if not cursor:
+                    break
+            keys = [(job["overall_score"] if job["overall_score"] is not None else -1, job["id"]) for job in jobs]
+            assert keys == sorted(keys, reverse=descending)
+
+
+def test_malformed_cursors_are_value_errors():
+    def encode(value):
+        return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+    with _store() as store:
+        _paging_store(store)
+        for cursor in ("not base64!", encode([1]), encode({"a": 1}), encode([{}, "x"]), encode([[1], "x"]),
+                       encode([None, "x"]), encode([True, "x"]), encode([50, 7]), encode([50, None])):
+            try:
+                store.query(limit=5, cursor=cursor)
+            except ValueError:
+                continue
+            raise AssertionError(f"accepted {cursor!r}")
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_"):
+            check()
+            print(f"ok  {name}")
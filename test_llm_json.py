@@ -0,0 +1,70 @@
+"""
+Regression checks for llm_json.loads on damaged fit analysis answers
+
+Run with `python test_llm_json.py` (or pytest).
+"""
+
+import json
+
+import llm_json
+
+CLEAN = """{
+  "overall_score": 72,
+  "breakdown": {"skills_match": 30, "experience_level": 20, "domain_industry": 14, "other_factors": 8},
+  "matching_skills": ["Python", "SQL"],
+  "missing_skills": ["Spark"],
+  "recommendation": "Good fit, apply.",
+  "priority": "Medium",
+  "should_apply": true
+}"""
+
+DAMAGED = {
+    "python literal": CLEAN.replace('"should_apply": true', '"should_apply": True'),
+    "bare key": CLEAN.replace('"priority":', "priority:"),
+    "smart quotes": CLEAN.replace('"Good fit, apply."', "“Good fit, apply.”"),
+    "comment": CLEAN.replace('"missing_skills": ["Spark"],', '"missing_skills": ["Spark"], // to learn'),
+    "raw newline": CLEAN.replace("Good fit, apply.", "Good fit,\napply."),
+    "truncated": CLEAN[: CLEAN.index("Good fit") + 4],
+}
+
+
+def test_damaged_answers_keep_the_outer_object():
+    for name, text in DAMAGED.items():
+        value = llm_json.loads("Here is the analysis:\n```json\n" + text + "\n```")
+        assert value.get("overall_score") == 72, name
+        assert value["breakdown"]["skills_match"] == 30, name
+
+
+def test_damaged_answers_count_as_repaired():
+    before = llm_json.stats()["repaired"]
+    for text in DAMAGED.values():
+        llm_json.loads(text)
+    assert llm_json.stats()["repaired"] - before == len(DAMAGED)
+
+
+def test_packed_array_with_python_literal():
+    element = json.loads(CLEAN)
+    packed = json.dumps([dict(element, job_id="job-0"), dict(element, job_id="job-1")], indent=2)
+    value = llm_json.loads(packed.replace("true", "True", 1), expect=list)
+    assert [e["job_id"] for e in value] == ["job-0", "job-1"]
+
+
+def test_prose_braces_before_the_answer_are_skipped():
+    value = llm_json.loads("Scores are out of {100} as asked [see below]:\n" + CLEAN)
+    assert value["overall_score"] == 72
+
+
+def test_unrecoverable_answer_fails_instead_of_returning_a_nested_object():
+    broken = CLEAN.replace('"overall_score": 72,', "'overall_score': 72,")
+    try:
+        value = llm_json.loads(broken)
+    except json.JSONDecodeError:
+        return
+    raise AssertionError(f"returned {value}")
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_"):
+            check()
+            print(f"ok  {name}")
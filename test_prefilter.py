@@ -0,0 +1,88 @@
+"""
+Checks for the local prefilter: scores don't depend on the batch, and the
+default PREFILTER_MIN_SCORE keeps relevant data jobs while rejecting
+unrelated postings
+
+Run with `python test_prefilter.py` (or pytest).
+"""
+
+import os
+
+from prefilter import MIN_SCORE, score_jobs
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "my_cv.txt")) as f:
+    CV = f.read()
+
+DATA_ENGINEER = {
+    "job_title": "Data Engineer",
+    "job_description": "Build batch and streaming pipelines with Spark and Airflow on AWS (S3, Glue, "
+                       "Redshift). Python and SQL, data modeling, CI with Docker. You will work with "
+                       "data scientists on feature pipelines.",
+}
+DATA_SCIENTIST = {
+    "job_title": "Data Scientist",
+    "job_description": "Machine learning models in Python with scikit-learn and pandas, statistical "
+                       "modeling, feature engineering, SQL, dashboards in Plotly.",
+}
+ML_ENGINEER = {
+    "job_title": "Machine Learning Engineer",
+    "job_description": "Deploy ML models with Docker and Kubernetes, Python, LLM APIs, LangChain, MLOps.",
+}
+UNRELATED = [
+    {"job_title": "Infirmier de nuit",
+     "job_description": "Soins aux patients, gestion des traitements, travail en équipe pluridisciplinaire, "
+                        "horaires de nuit en service de réanimation."},
+    {"job_title": "Commercial terrain",
+     "job_description": "Prospection de clients B2B, négociation, développement du chiffre d'affaires, "
+                        "permis B exigé, véhicule de fonction."},
+    {"job_title": "Chef de partie",
+     "job_description": "Cuisine traditionnelle, gestion des stocks, hygiène HACCP, service midi et soir."},
+    {"job_title": "Registered Nurse",
+     "job_description": "Provide patient care in the ICU, administer medication, maintain records, work in "
+                        "a multidisciplinary team. Night shifts. Experience in critical care required."},
+    {"job_title": "Project Manager",
+     "job_description": "Lead construction projects, manage budgets and schedules, coordinate "
+                        "subcontractors, ensure safety compliance. 5 years of experience."},
+]
+
+BATCHES = {
+    "alone": [DATA_ENGINEER],
+    "among unrelated jobs": [DATA_ENGINEER] + UNRELATED,
+    "among data jobs": [DATA_ENGINEER, DATA_SCIENTIST, ML_ENGINEER] * 5,
+    "among other data engineer postings": [DATA_ENGINEER] + [
+        dict(DATA_ENGINEER, job_title=f"Data Engineer {i}") for i in range(50)
+    ],
+}
+
+
+def test_a_job_scores_the_same_in_any_batch():
+    scores = {name: score_jobs(jobs, CV)[0]["prescore"] for name, jobs in BATCHES.items()}
+    assert len(set(scores.values())) == 1, scores
+
+
+def test_relevant_data_jobs_pass_the_default_cutoff():
+    for name, jobs in BATCHES.items():
+        result = score_jobs(jobs, CV)[0]
+        assert result["passed"], (name, result)
+        assert {"python", "sql", "docker"} <= set(result["shared_terms"]), result
+    for job in (DATA_SCIENTIST, ML_ENGINEER):
+        assert score_jobs([job], CV)[0]["prescore"] >= MIN_SCORE + 2, job["job_title"]
+
+
+def test_unrelated_jobs_fail_the_default_cutoff():
+    for result, job in zip(score_jobs(UNRELATED + [DATA_ENGINEER], CV), UNRELATED):
+        assert not result["passed"], (job["job_title"], result)
+
+
+def test_invalid_and_empty_jobs_are_rejected():
+    results = score_jobs(["not a job", {"job_title": "", "job_description": ""}], CV, min_score=0)
+    assert [r["passed"] for r in results] == [False, False]
+    assert results[0]["reason"] == "Invalid job (expected an object)"
+    assert results[1]["reason"] == "Empty job description"
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_"):
+            check()
+            print(f"ok  {name}")